@@ -1,21 +1,29 @@
-from fastapi import APIRouter, HTTPException, Response, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response, status, Depends, Query
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from app.core import database
+from app.core import data_version, database, serialization
 from app.models import models
 from app.schemas import category as schemas
+from app.schemas import tasks as task_schemas
 from app.core.auth import get_current_user_with_rate_limit
+from app.core.fieldsets import TaskView
 
 router = APIRouter()
 
 @router.get("/categories", response_model=schemas.CategoryListResponse)
 def list_categories(
+    request: Request,
+    response: Response,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
     """
     Lista todas las categorías del usuario autenticado.
     """
+    etag, not_modified = data_version.check(request, db, current_user.id)
+    if not_modified:
+        return not_modified
+
     categories = db.query(models.Category).filter(
         models.Category.user_id == current_user.id
     ).all()
@@ -34,6 +42,7 @@ def list_categories(
         }
         categories_with_count.append(category_dict)
     
+    data_version.set_headers(response, etag)
     return {
         "categories": categories_with_count,
         "total": len(categories)
@@ -68,6 +77,7 @@ def create_category(
     )
     
     db.add(category)
+    data_version.bump(db, current_user.id)
     db.commit()
     db.refresh(category)
     
@@ -147,6 +157,7 @@ def update_category(
         category.icon = data["icon"]
     
     db.add(category)
+    data_version.bump(db, current_user.id)
     db.commit()
     db.refresh(category)
     
@@ -184,6 +195,7 @@ def delete_category(
     ).update({"category_id": None})
     
     db.delete(category)
+    data_version.bump(db, current_user.id)
     db.commit()
     
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -191,6 +203,8 @@ def delete_category(
 @router.get("/categories/{category_id}/tasks")
 def get_category_tasks(
     category_id: int,
+    fields: Optional[str] = Query(None, description="Campos de tarea a devolver separados por coma"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir: 'category'"),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
@@ -207,13 +221,32 @@ def get_category_tasks(
     if category.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para ver esta categoría")
     
-    tasks = db.query(models.Task).filter(
+    view = TaskView(fields, expand)
+    query = db.query(models.Task).filter(
         models.Task.category_id == category_id,
         models.Task.user_id == current_user.id
-    ).all()
-    
-    return {
+    )
+
+    if serialization.FAST_SERIALIZATION and view.is_default:
+        # Tareas con la forma de TaskOut, leídas como filas
+        rows = serialization.task_rows.with_columns(query).all()
+        return serialization.json_response({
+            "category": {column: getattr(category, column) for column in models.Category.__table__.columns.keys()},
+            "tasks": serialization.task_rows.encode(rows),
+            "total": len(rows)
+        })
+
+    tasks = view.apply(query).all()
+    
+    if view.is_default:
+        # Mismos campos que el resto de rutas de tareas (sin columnas internas)
+        return {
+            "category": category,
+            "tasks": [task_schemas.TaskOut.from_orm(t) for t in tasks],
+            "total": len(tasks)
+        }
+    return view.response({
         "category": category,
-        "tasks": tasks,
+        "tasks": [view.serialize(t) for t in tasks],
         "total": len(tasks)
-    }
\ No newline at end of file
+    })
\ No newline at end of file
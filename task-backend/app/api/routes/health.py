@@ -0,0 +1,33 @@
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from dotenv import load_dotenv
+from app.core import notification_retention
+from app.core.cache import stats_cache, token_cache, user_cache
+
+load_dotenv()
+
+router = APIRouter()
+
+# Si está definido, /health/stats exige la cabecera X-Stats-Token con este valor
+HEALTH_STATS_TOKEN = os.getenv("HEALTH_STATS_TOKEN", "")
+
+@router.get("/health")
+def health():
+    return {"status": "ok"}
+
+@router.get("/health/stats")
+def health_stats(x_stats_token: Optional[str] = Header(None)):
+    """Contadores internos de este proceso (cada worker lleva los suyos)"""
+    if HEALTH_STATS_TOKEN and not secrets.compare_digest(x_stats_token or "", HEALTH_STATS_TOKEN):
+        raise HTTPException(status_code=403, detail="Token de estadísticas inválido")
+    return {
+        "pid": os.getpid(),
+        "caches": {
+            "token": token_cache.stats(),
+            "user": user_cache.stats(),
+            "task_stats": stats_cache.stats(),
+        },
+        "notification_retention": notification_retention.stats(),
+    }
@@ -1,52 +1,134 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import json
+import os
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.core import database
+from app.core import data_version, database, notification_retention, unread_counter
 from app.models import models
 from app.schemas import notification as schemas
-from app.core.auth import get_current_user_with_rate_limit
+from app.core.auth import STREAM_TICKET_TTL_SECONDS, authenticate_token, create_stream_ticket, get_current_user_with_rate_limit, redeem_stream_ticket
+from app.core.notification_bus import notification_broker
+from app.core.pagination import decode_cursor, keyset_filter, next_cursor_for, order_by_clauses
 
 router = APIRouter()
 
+# Orden de la lista: más recientes primero, id como desempate (también para el cursor)
+NOTIFICATION_SORT = "created_at:desc"
+NOTIFICATION_SORT_KEY = [(models.Notification.created_at, True), (models.Notification.id, True)]
+
+# /notifications/stream
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", 15))
+STREAM_MAX_IDLE_SECONDS = float(os.getenv("NOTIFICATION_STREAM_MAX_IDLE_SECONDS", 300))
+STREAM_BATCH_SIZE = int(os.getenv("NOTIFICATION_STREAM_BATCH_SIZE", 50))
+STREAM_RETRY_MS = 5000
+
+def _notification_rows(db: Session):
+    """Columnas de NotificationOut + título de la tarea en el mismo SELECT (JOIN)"""
+    return db.query(
+        models.Notification.id,
+        models.Notification.task_id,
+        models.Notification.user_id,
+        models.Notification.message,
+        models.Notification.is_read,
+        models.Notification.created_at,
+        models.Task.title.label("task_title"),
+    ).outerjoin(models.Task, models.Task.id == models.Notification.task_id)
+
+def _notification_dict(row) -> dict:
+    data = row._asdict()
+    if data["task_title"] is None:
+        data["task_title"] = "Tarea eliminada"
+    return data
+
 @router.get("/notifications", response_model=schemas.NotificationListResponse)
 def get_user_notifications(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=50),
     is_read: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="Paginación por cursor: vacío para la primera página, luego el next_cursor recibido"),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
-    # Consulta base
-    query = db.query(models.Notification).filter(models.Notification.user_id == current_user.id)
-    
-    # Filtrar por estado de lectura si se especifica
+    """
+    Notificaciones del usuario: una consulta para total + no leídas y otra
+    para la página (con el título de la tarea por JOIN), sin importar `limit`.
+    """
+    etag, not_modified = data_version.check(request, db, current_user.id)
+    if not_modified:
+        return not_modified
+
+    # Totales en una sola consulta; las no leídas salen del contador de users
+    if is_read is False:
+        total = unread_count = unread_counter.current(db, current_user.id)
+    else:
+        count_query = db.query(
+            func.count(models.Notification.id),
+            unread_counter.unread_column(current_user.id),
+        ).filter(models.Notification.user_id == current_user.id)
+        if is_read:
+            count_query = count_query.filter(models.Notification.is_read == True)
+        total, unread_count = count_query.one()
+
+    # Página
+    query = _notification_rows(db).filter(models.Notification.user_id == current_user.id)
     if is_read is not None:
         query = query.filter(models.Notification.is_read == is_read)
-    
-    # Obtener totales
-    total = query.count()
-    unread_count = db.query(models.Notification).filter(
-        models.Notification.user_id == current_user.id,
-        models.Notification.is_read == False
-    ).count()
-    
-    # Paginación
-    offset = (page - 1) * limit
-    notifications = query.order_by(models.Notification.created_at.desc()).offset(offset).limit(limit).all()
-    
-    # Agregar título de tarea a cada notificación
-    notifications_with_titles = []
-    for notification in notifications:
-        task = db.query(models.Task).filter(models.Task.id == notification.task_id).first()
-        notification_dict = {**notification.__dict__}
-        notification_dict['task_title'] = task.title if task else "Tarea eliminada"
-        notifications_with_titles.append(notification_dict)
-    
+    query = query.order_by(*order_by_clauses(NOTIFICATION_SORT_KEY))
+
+    if cursor is not None:
+        if cursor:
+            query = query.filter(keyset_filter(NOTIFICATION_SORT_KEY, decode_cursor(cursor, NOTIFICATION_SORT, NOTIFICATION_SORT_KEY)))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    rows = query.limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    data_version.set_headers(response, etag)
     return {
-        "notifications": notifications_with_titles,
-        "total": total,
-        "unread_count": unread_count
+        "notifications": [_notification_dict(row) for row in rows],
+        "total": total or 0,
+        "unread_count": unread_count or 0,
+        "next_cursor": next_cursor_for(rows, NOTIFICATION_SORT, NOTIFICATION_SORT_KEY) if has_next else None
+    }
+
+@router.get("/notifications/unread-count", response_model=schemas.UnreadCountResponse)
+def get_unread_count(
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """Solo el contador de no leídas (una lectura por clave primaria)"""
+    return {"unread_count": unread_counter.current(db, current_user.id)}
+
+@router.get("/notifications/archive", response_model=schemas.NotificationArchiveOut)
+def get_notification_archive(
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """Resumen compactado de las notificaciones ya purgadas por retención"""
+    archive = db.get(models.NotificationArchive, current_user.id)
+    summary = {
+        "retention_read_days": notification_retention.RETENTION_READ_DAYS,
+        "retention_unread_days": notification_retention.RETENTION_UNREAD_DAYS,
     }
+    if archive is not None:
+        summary.update(
+            archived_count=archive.archived_count,
+            archived_unread=archive.archived_unread,
+            oldest_created_at=archive.oldest_created_at,
+            newest_created_at=archive.newest_created_at,
+            last_archived_at=archive.last_archived_at,
+        )
+    return summary
 
 @router.put("/notifications/{notification_id}/read", response_model=schemas.NotificationOut)
 def mark_notification_as_read(
@@ -54,23 +136,26 @@ def mark_notification_as_read(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
-    notification = db.query(models.Notification).filter(
+    row = _notification_rows(db).filter(
         models.Notification.id == notification_id,
         models.Notification.user_id == current_user.id
     ).first()
     
-    if not notification:
+    if not row:
         raise HTTPException(status_code=404, detail="Notificación no encontrada")
     
-    notification.is_read = True
+    unread_counter.lock_users(db, [current_user.id])
+    marked = db.query(models.Notification).filter(
+        models.Notification.id == notification_id,
+        models.Notification.is_read == False
+    ).update({"is_read": True}, synchronize_session=False)
+    unread_counter.adjust(db, current_user.id, -marked)
+    data_version.bump(db, current_user.id)
     db.commit()
-    db.refresh(notification)
-    
-    # Agregar título de tarea
-    task = db.query(models.Task).filter(models.Task.id == notification.task_id).first()
-    notification_dict = {**notification.__dict__}
-    notification_dict['task_title'] = task.title if task else "Tarea eliminada"
     
+    # Ya tenemos la fila (con el título de la tarea): no hace falta releerla
+    notification_dict = _notification_dict(row)
+    notification_dict["is_read"] = True
     return notification_dict
 
 @router.put("/notifications/read-all", response_model=dict)
@@ -78,10 +163,15 @@ def mark_all_notifications_as_read(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
-    db.query(models.Notification).filter(
+    unread_counter.lock_users(db, [current_user.id])
+    marked = db.query(models.Notification).filter(
         models.Notification.user_id == current_user.id,
         models.Notification.is_read == False
     ).update({"is_read": True})
+    # Se descuentan las marcadas (no se fija en 0): otra transacción pudo
+    # insertar no leídas que este UPDATE no vio
+    unread_counter.adjust(db, current_user.id, -marked)
+    data_version.bump(db, current_user.id)
     db.commit()
     
     return {"message": "Todas las notificaciones marcadas como leídas"}
@@ -92,14 +182,160 @@ def delete_notification(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
+    # Lectura con bloqueo después de users: is_read es el vigente
+    unread_counter.lock_users(db, [current_user.id])
     notification = db.query(models.Notification).filter(
         models.Notification.id == notification_id,
         models.Notification.user_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notificación no encontrada")
     
+    if not notification.is_read:
+        unread_counter.adjust(db, current_user.id, -1)
     db.delete(notification)
+    data_version.bump(db, current_user.id)
     db.commit()
-    return
\ No newline at end of file
+    return
+
+@router.post("/notifications/stream/ticket", response_model=schemas.StreamTicketResponse)
+def create_notification_stream_ticket(
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """
+    Ticket de un solo uso (NOTIFICATION_STREAM_TICKET_TTL_SECONDS) para abrir
+    /notifications/stream?ticket=... con EventSource, que no puede enviar la
+    cabecera Authorization. Pedir uno nuevo en cada reconexión.
+    """
+    return {"ticket": create_stream_ticket(current_user.id), "expires_in": STREAM_TICKET_TTL_SECONDS}
+
+@router.get("/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="Ticket de POST /notifications/stream/ticket (para EventSource)")
+):
+    """
+    Server-Sent Events con las notificaciones nuevas (`event: notification`,
+    con `id:` para reanudar vía Last-Event-ID) y los cambios del contador de
+    no leídas (`event: unread`). Envía `: ping` cada
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS y cierra la conexión tras
+    NOTIFICATION_STREAM_MAX_IDLE_SECONDS sin eventos (EventSource reconecta).
+    No retiene una conexión del pool entre eventos.
+    Autenticación: `Authorization: Bearer` o `?ticket=` (nunca el JWT en la URL).
+    """
+    scheme, _, value = request.headers.get("authorization", "").partition(" ")
+    token = value.strip() if scheme.lower() == "bearer" else None
+    if not token and not ticket:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    user = await run_in_threadpool(_authenticate_stream, token, ticket)
+
+    subscription = notification_broker.subscribe(user.id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Demasiadas conexiones de notificaciones abiertas",
+            headers={"Retry-After": str(int(STREAM_RETRY_MS / 1000))}
+        )
+
+    try:
+        last_id = int(request.headers.get("last-event-id", ""))
+    except ValueError:
+        last_id = None
+
+    return _SubscriptionStreamingResponse(
+        subscription,
+        _event_stream(subscription, last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class _SubscriptionStreamingResponse(StreamingResponse):
+    """
+    Libera el cupo de la suscripción al terminar la respuesta, sea cual sea el
+    motivo. El finally del generador no alcanza: si el cliente se desconecta
+    antes del primer envío, el generador nunca arranca.
+    """
+
+    def __init__(self, subscription, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            notification_broker.unsubscribe(self.subscription)
+
+def _authenticate_stream(token: Optional[str], ticket: Optional[str]):
+    db = database.SessionLocal()
+    try:
+        if token:
+            return authenticate_token(token, db)
+        return redeem_stream_ticket(ticket, db)
+    finally:
+        db.close()
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":"))
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {payload}\n\n"
+
+def _stream_changes(user_id: int, last_id: Optional[int], last_unread: Optional[int]):
+    """
+    Lee (sesión propia y corta) las notificaciones con id > last_id y el
+    contador de no leídas. Devuelve (eventos, last_id, unread).
+    """
+    db = database.SessionLocal()
+    try:
+        events = []
+        if last_id is None:
+            # Conexión nueva sin Last-Event-ID: solo lo que llegue desde ahora
+            last_id = db.query(func.max(models.Notification.id)).filter(
+                models.Notification.user_id == user_id
+            ).scalar() or 0
+        else:
+            rows = _notification_rows(db).filter(
+                models.Notification.user_id == user_id,
+                models.Notification.id > last_id
+            ).order_by(models.Notification.id).limit(STREAM_BATCH_SIZE + 1).all()
+            if len(rows) > STREAM_BATCH_SIZE:
+                # Demasiado atrasado: el cliente debe recargar la lista completa
+                last_id = db.query(func.max(models.Notification.id)).filter(
+                    models.Notification.user_id == user_id
+                ).scalar() or last_id
+                events.append(_sse("resync", {"last_id": last_id}, last_id))
+            else:
+                for row in rows:
+                    events.append(_sse("notification", _notification_dict(row), row.id))
+                    last_id = row.id
+
+        unread = unread_counter.current(db, user_id)
+        if unread != last_unread:
+            events.append(_sse("unread", {"unread_count": unread}))
+        return events, last_id, unread
+    finally:
+        db.close()
+
+async def _event_stream(subscription, last_id: Optional[int]):
+    # El cupo lo libera _SubscriptionStreamingResponse al cerrar la conexión
+    user_id = subscription.user_id
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+    events, last_id, unread = await run_in_threadpool(_stream_changes, user_id, last_id, None)
+    for chunk in events:
+        yield chunk
+    last_activity = time.monotonic()
+
+    while time.monotonic() - last_activity < STREAM_MAX_IDLE_SECONDS:
+        try:
+            await asyncio.wait_for(subscription.event.wait(), STREAM_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            yield ": ping\n\n"
+            continue
+        # Las señales que lleguen mientras se consulta/envía se fusionan en la próxima vuelta
+        subscription.event.clear()
+        events, last_id, unread = await run_in_threadpool(_stream_changes, user_id, last_id, unread)
+        for chunk in events:
+            yield chunk
+        if events:
+            last_activity = time.monotonic()
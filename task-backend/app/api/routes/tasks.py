@@ -1,13 +1,25 @@
-from fastapi import APIRouter, HTTPException, Response, status, Query, Depends, Request
+import codecs
+import csv
+import io
+import json
+import os
+from fastapi import APIRouter, HTTPException, Response, status, Query, Depends, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from pydantic import ValidationError
+from sqlalchemy import and_, case, delete, func, insert, select, update
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc, asc
-from app.core import database
+from app.core import data_version, database, search, serialization, unread_counter
 from app.models import models
 from app.schemas import tasks as schemas
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 from app.core.auth import get_current_user_with_rate_limit
-from app.core.priority_queue import TaskPriorityQueue
+from app.core.priority_queue import PRIORITY_SORT_KEY, priority_order_by, priority_sort_columns, set_priority_sort_columns
+from app.core.fieldsets import TaskView
+from app.core.pagination import decode_cursor, keyset_filter, next_cursor_for, order_by_clauses
+from app.core.priority_index import priority_index
+from app.core.cache import stats_cache
+from app.core.notification_outbox import queue_notification
 
 router = APIRouter()
 
@@ -23,45 +35,107 @@ def _is_overdue_from_values(due_date, status):
     return due < date.today() and status != "completed"
 
 def create_notification(db: Session, task_id: int, user_id: int, message: str):
-    """Función auxiliar para crear notificaciones"""
-    notification = models.Notification(
-        task_id=task_id,
-        user_id=user_id,
-        message=message
-    )
-    db.add(notification)
-    db.commit()
-    db.refresh(notification)
-    return notification
+    """
+    Función auxiliar para crear notificaciones. Se insertan en el commit de
+    la misma transacción que la tarea (ver core/notification_outbox.py).
+    """
+    queue_notification(db, task_id, user_id, message)
 
 @router.get("/listarTareas", response_model=schemas.TaskListResponse)
 def list_tasks(
     request: Request,
+    response: Response,
     q: Optional[str] = Query(None),
     status: Optional[schemas.TaskStatus] = Query(None),
     important: Optional[bool] = Query(None),
     category_id: Optional[int] = Query(None),  # ✅ AGREGADO
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Elementos por página"),
-    sort: Optional[str] = Query("created_at:desc", description="Ordenar por campo:dirección (ej: 'title:asc', 'priority:desc')"),
+    sort: Optional[str] = Query("created_at:desc", description="Ordenar por campo:dirección (ej: 'title:asc', 'priority:desc') o 'relevance' junto con q"),
     use_priority_queue: bool = Query(False, description="Usar cola de prioridad para ordenamiento"),
+    cursor: Optional[str] = Query(None, description="Paginación por cursor: vacío para la primera página, luego el next_cursor recibido"),
+    include_total: bool = Query(True, description="Calcular total y total_pages (COUNT adicional)"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma (ej: 'id,title,status')"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir: 'category'"),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
     """
     Lista SOLO las tareas del usuario autenticado con paginación, filtrado y ordenamiento.
+    Responde 304 si If-None-Match coincide con la versión de datos del usuario.
     """
+    view = TaskView(fields, expand)
+    etag, not_modified = data_version.check(request, db, current_user.id)
+    if not_modified:
+        return not_modified
     query = db.query(models.Task).filter(models.Task.user_id == current_user.id)
 
-    # Aplicar filtros
+    # sort=relevance solo aplica cuando hay texto de búsqueda
+    sort_by_relevance = (sort or "").split(":")[0] == "relevance"
+    if sort_by_relevance:
+        sort = None
+        sort_by_relevance = bool(q) and not use_priority_queue
+    if sort_by_relevance and cursor:
+        raise HTTPException(status_code=400, detail="sort=relevance no admite paginación por cursor")
+
+    query = _apply_task_filters(query, db, q, status, important, category_id, order_by_relevance=sort_by_relevance)
+
+    sort_spec, sort_key = _list_sort_key(sort, use_priority_queue)
+    if sort_by_relevance:
+        # El orden por ranking ya lo aplicó apply_search
+        sort_key = []
+
+    # Total opcional: en listas grandes el COUNT cuesta tanto como la página
+    total = query.count() if include_total else None
+
+    query = query.order_by(*order_by_clauses(sort_key))
+    # Las columnas de orden se cargan siempre: el cursor se arma con ellas
+    sort_columns = [column.key for column, _ in sort_key]
+    fast = serialization.FAST_SERIALIZATION and view.is_default
+    if fast:
+        query = serialization.task_rows.with_columns(query, extra_columns=sort_columns)
+    else:
+        query = view.apply(query, extra_columns=sort_columns)
+
+    if cursor is not None:
+        # Paginación por cursor (keyset): WHERE (campo, id) > último visto
+        if cursor:
+            query = query.filter(keyset_filter(sort_key, decode_cursor(cursor, sort_spec, sort_key)))
+        page = None
+        has_prev = bool(cursor)
+    else:
+        query = query.offset((page - 1) * limit)
+        has_prev = page > 1
+
+    # Se pide una fila extra para saber si hay página siguiente sin contar
+    rows = query.limit(limit + 1).all()
+    has_next = len(rows) > limit
+    tasks = rows[:limit]
+
+    result = {
+        "tasks": tasks,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total + limit - 1) // limit if total is not None else None,
+        "has_next": has_next,
+        "has_prev": has_prev,
+        "next_cursor": next_cursor_for(tasks, sort_spec, sort_key) if has_next and sort_key else None
+    }
+    if fast:
+        result["tasks"] = serialization.task_rows.encode(tasks)
+        return data_version.set_headers(serialization.json_response(result), etag)
+    if view.is_default:
+        data_version.set_headers(response, etag)
+        return result
+    result["tasks"] = [view.serialize(t) for t in tasks]
+    return data_version.set_headers(view.response(result), etag)
+
+def _apply_task_filters(query, db: Session, q, status, important, category_id, order_by_relevance: bool = False):
+    """Filtros de /listarTareas (compartidos con /tasks/export)"""
     if q:
-        qn = f"%{q.lower()}%"
-        query = query.filter(
-            or_(
-                models.Task.title.ilike(qn),
-                models.Task.description.ilike(qn)
-            )
-        )
+        # Búsqueda de texto completo (FULLTEXT en MySQL, FTS5 en SQLite)
+        query = search.apply_search(query, db, q, order_by_relevance=order_by_relevance)
     
     if status:
         query = query.filter(models.Task.status == status.value)
@@ -72,69 +146,35 @@ def list_tasks(
     # ✅ NUEVO: Filtro por categoría
     if category_id is not None:
         query = query.filter(models.Task.category_id == category_id)
+    return query
 
-    # Resto del código permanece igual...
-    # Usar cola de prioridad para ordenamiento
+def _list_sort_key(sort: Optional[str], use_priority_queue: bool):
+    """
+    Devuelve (sort_spec, sort_key) para list_tasks. sort_key es una lista de
+    (columna, descendente) que siempre termina en id para desempatar, así el
+    orden es total y sirve tanto para OFFSET como para cursores.
+    """
     if use_priority_queue:
-        all_tasks = query.all()
-        local_priority_queue = TaskPriorityQueue()
-        local_priority_queue.push_all(all_tasks)
-        priority_ordered_tasks = local_priority_queue.get_priority_list()
-        
-        total = len(priority_ordered_tasks)
-        offset = (page - 1) * limit
-        tasks = priority_ordered_tasks[offset:offset + limit]
-        
-        total_pages = (total + limit - 1) // limit
-        has_next = page < total_pages
-        has_prev = page > 1
+        # Orden de prioridad resuelto en SQL sobre las columnas persistidas
+        return "priority_queue", list(PRIORITY_SORT_KEY)
 
-        return {
-            "tasks": tasks,
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": total_pages,
-            "has_next": has_next,
-            "has_prev": has_prev
-        }
-    else:
-        # Ordenamiento tradicional
-        if sort:
-            sort_parts = sort.split(":")
-            sort_field = sort_parts[0]
-            sort_direction = sort_parts[1] if len(sort_parts) > 1 else "asc"
-            
-            if hasattr(models.Task, sort_field):
-                field = getattr(models.Task, sort_field)
-                if sort_direction == "desc":
-                    query = query.order_by(desc(field))
-                else:
-                    query = query.order_by(asc(field))
-        else:
-            query = query.order_by(models.Task.created_at.desc())
+    if not sort:
+        sort = "created_at:desc"
+    sort_parts = sort.split(":")
+    sort_field = sort_parts[0]
+    sort_direction = sort_parts[1] if len(sort_parts) > 1 else "asc"
+    descending = sort_direction == "desc"
 
-        total = query.count()
-        offset = (page - 1) * limit
-        tasks = query.offset(offset).limit(limit).all()
-
-        total_pages = (total + limit - 1) // limit
-        has_next = page < total_pages
-        has_prev = page > 1
-
-        return {
-            "tasks": tasks,
-            "total": total,
-            "page": page,
-            "limit": limit,
-            "total_pages": total_pages,
-            "has_next": has_next,
-            "has_prev": has_prev
-        }
+    columns = models.Task.__table__.columns
+    if sort_field not in columns or sort_field == "id":
+        return f"id:{sort_direction}", [(models.Task.id, descending)]
+    return f"{sort_field}:{sort_direction}", [(getattr(models.Task, sort_field), descending), (models.Task.id, descending)]
 
 @router.get("/tareas-prioritarias", response_model=List[schemas.TaskOut])
 def get_priority_tasks(
     limit: int = Query(10, ge=1, le=50, description="Número de tareas prioritarias a obtener"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir: 'category'"),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
@@ -142,16 +182,38 @@ def get_priority_tasks(
     Obtiene las tareas más prioritarias.
     Ordena por: prioridad, fecha de vencimiento e importancia.
     """
-    tasks = db.query(models.Task).filter(
-        models.Task.user_id == current_user.id,
-        models.Task.is_completed == False
-    ).all()
-    
-    priority_queue = TaskPriorityQueue()
-    priority_queue.push_all(tasks)
-    priority_tasks = priority_queue.get_priority_list(limit)
-    
-    return priority_tasks
+    def load_pending():
+        return db.query(models.Task).filter(
+            models.Task.user_id == current_user.id,
+            models.Task.is_completed == False
+        ).with_entities(
+            models.Task.id,
+            models.Task.priority_rank,
+            models.Task.due_sort_key,
+            models.Task.important,
+            models.Task.is_completed
+        ).all()
+
+    view = TaskView(fields, expand)
+
+    # Índice en memoria por usuario (O(k)), válido mientras no cambie su
+    # data_version; solo se leen de la DB las k filas
+    version = data_version.current(db, current_user.id)
+    task_ids = priority_index.top_ids(current_user.id, version, limit, load_pending)
+    if not task_ids:
+        return []
+
+    tasks_by_id = {
+        t.id: t for t in view.apply(db.query(models.Task).filter(
+            models.Task.id.in_(task_ids),
+            models.Task.user_id == current_user.id,
+            models.Task.is_completed == False
+        ))
+    }
+    priority_tasks = [tasks_by_id[task_id] for task_id in task_ids if task_id in tasks_by_id]
+    if view.is_default:
+        return priority_tasks
+    return view.response([view.serialize(t) for t in priority_tasks])
 
 @router.get("/tareas-proximas-vencer", response_model=List[schemas.TaskOut])
 def get_upcoming_tasks(
@@ -168,38 +230,30 @@ def get_upcoming_tasks(
     today = date.today()
     threshold_date = today + timedelta(days=days_threshold)
     
-    tasks = db.query(models.Task).filter(
+    upcoming_tasks = db.query(models.Task).filter(
         models.Task.user_id == current_user.id,
         models.Task.is_completed == False,
         models.Task.due_date.isnot(None),
         models.Task.due_date <= threshold_date,
         models.Task.due_date >= today
-    ).all()
-    
-    date_priority_queue = TaskPriorityQueue()
-    date_priority_queue.push_all(tasks)
-    upcoming_tasks = date_priority_queue.get_priority_list(limit)
+    ).order_by(*priority_order_by()).limit(limit).all()
     
     return upcoming_tasks
 
-@router.post("/crearTarea", status_code=status.HTTP_201_CREATED, response_model=schemas.TaskOut)
-def create_task(
-    request: Request,
-    payload: schemas.TaskCreate, 
-    response: Response,
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(get_current_user_with_rate_limit)
-):
-    """
-    Crea la tarea para el usuario autenticado.
-    """
+def _new_task(payload: schemas.TaskCreate, user_id: int, now: datetime) -> models.Task:
+    """Construye la tarea a partir de TaskCreate"""
+    task = models.Task(**_task_values(payload, user_id, now))
+    set_priority_sort_columns(task)
+    return task
+
+def _task_values(payload: schemas.TaskCreate, user_id: int, now: datetime) -> dict:
+    """Columnas de una tarea nueva (sin las del score de prioridad)"""
     obj = payload.dict()
-    now = datetime.utcnow()
 
     status_value = "completed" if obj.get("is_completed") else "pending"
     completed_at_value = now if obj.get("is_completed") else None
 
-    task = models.Task(
+    return dict(
         title=obj["title"],
         description=obj.get("description"),
         due_date=obj.get("due_date"),
@@ -207,7 +261,7 @@ def create_task(
         priority=obj.get("priority"),
         status=status_value,
         important=bool(obj.get("important")),
-        user_id=current_user.id,
+        user_id=user_id,
         category_id=obj.get("category_id"), 
         created_at=now,
         updated_at=now,
@@ -215,9 +269,41 @@ def create_task(
         is_completed=bool(obj.get("is_completed"))
     )
 
+def _task_row(payload: schemas.TaskCreate, user_id: int, now: datetime) -> dict:
+    """Fila completa para insert(models.Task) (compartido por /tasks/bulk e /tasks/import)"""
+    values = _task_values(payload, user_id, now)
+    values["priority"] = payload.priority.value
+    values["priority_rank"], values["due_sort_key"] = priority_sort_columns(
+        payload.priority, payload.due_date, payload.due_time
+    )
+    return values
+
+def _priority_snapshot(task: models.Task) -> models.Task:
+    """Copia transitoria con las columnas de priority_sort_key, legible después del commit"""
+    return models.Task(
+        id=task.id,
+        user_id=task.user_id,
+        priority_rank=task.priority_rank,
+        due_sort_key=task.due_sort_key,
+        important=task.important,
+        is_completed=task.is_completed,
+    )
+
+@router.post("/crearTarea", status_code=status.HTTP_201_CREATED, response_model=schemas.TaskOut)
+def create_task(
+    request: Request,
+    payload: schemas.TaskCreate, 
+    response: Response,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """
+    Crea la tarea para el usuario autenticado.
+    """
+    task = _new_task(payload, current_user.id, datetime.utcnow())
+
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    db.flush()  # id para la notificación
 
     create_notification(
         db=db,
@@ -225,6 +311,11 @@ def create_task(
         user_id=current_user.id,
         message=f"📝 Tarea creada: {task.title}"
     )
+    data_version.bump(db, current_user.id)
+    version = data_version.current(db, current_user.id)
+    db.commit()
+    db.refresh(task)
+    priority_index.record_write(current_user.id, version, saved=[task])
 
     response.headers["Location"] = f"/listarTarea/{task.id}"
     return task
@@ -233,15 +324,20 @@ def create_task(
 def get_task(
     request: Request,
     task_id: int, 
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por coma"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir: 'category'"),
     db: Session = Depends(database.get_db), 
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
-    t = db.query(models.Task).filter(models.Task.id == task_id).first()
+    view = TaskView(fields, expand)
+    t = view.apply(db.query(models.Task).filter(models.Task.id == task_id)).first()
     if not t:
         raise HTTPException(status_code=404, detail="not found")
     if t.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para ver esta tarea")
-    return t
+    if view.is_default:
+        return t
+    return view.response(view.serialize(t))
 
 @router.put("/editarTarea/{task_id}", response_model=schemas.TaskOut)
 def update_task(
@@ -262,6 +358,29 @@ def update_task(
     old_status = t.status
     old_completed = t.is_completed
 
+    _apply_task_update(t, data)
+    db.add(t)
+
+    for message in _update_notification_messages(t, data, old_status, old_completed):
+        create_notification(
+            db=db,
+            task_id=t.id,
+            user_id=current_user.id,
+            message=message
+        )
+
+    data_version.bump(db, current_user.id)
+    version = data_version.current(db, current_user.id)
+    db.commit()
+    db.refresh(t)
+    priority_index.record_write(current_user.id, version, saved=[t])
+    return t
+
+def _apply_task_update(t: models.Task, data: dict):
+    """
+    Aplica los campos de TaskUpdate a la tarea (compartido con /tasks/bulk).
+    Lanza 400 si se intenta sacar del estado completado.
+    """
     if t.status == "completed" and data.get("status") and data.get("status") != "completed":
         raise HTTPException(status_code=400, detail="completed tasks cannot change to other states")
 
@@ -293,42 +412,24 @@ def update_task(
             t.completed_at = None
 
     t.updated_at = datetime.utcnow()
-    db.add(t)
-    db.commit()
-    db.refresh(t)
+    set_priority_sort_columns(t)
+
+def _update_notification_messages(t: models.Task, data: dict, old_status, old_completed) -> List[str]:
+    """Mensajes de notificación que genera una edición (ya aplicada sobre `t`)"""
+    messages = []
 
     if ("is_completed" in data and data["is_completed"] and not old_completed) or \
        ("status" in data and data["status"] == "completed" and old_status != "completed"):
-        create_notification(
-            db=db,
-            task_id=t.id,
-            user_id=current_user.id,
-            message=f"✅ Tarea completada: {t.title}"
-        )
+        messages.append(f"✅ Tarea completada: {t.title}")
     
     elif "is_completed" in data and not data["is_completed"] and old_completed:
-        create_notification(
-            db=db,
-            task_id=t.id,
-            user_id=current_user.id,
-            message=f"🔄 Tarea pendiente: {t.title}"
-        )
+        messages.append(f"🔄 Tarea pendiente: {t.title}")
     
     if "priority" in data and data["priority"] == "urgent" and t.priority != "urgent":
-        create_notification(
-            db=db,
-            task_id=t.id,
-            user_id=current_user.id,
-            message=f"🚨 Prioridad urgente: {t.title}"
-        )
+        messages.append(f"🚨 Prioridad urgente: {t.title}")
     
     if "important" in data and data["important"] == True and not t.important:
-        create_notification(
-            db=db,
-            task_id=t.id,
-            user_id=current_user.id,
-            message=f"⭐ Tarea importante: {t.title}"
-        )
+        messages.append(f"⭐ Tarea importante: {t.title}")
     
     if "due_date" in data and data["due_date"]:
         due_date = data["due_date"]
@@ -336,36 +437,16 @@ def update_task(
         days_until_due = (due_date - today).days
         
         if days_until_due == 1:
-            create_notification(
-                db=db,
-                task_id=t.id,
-                user_id=current_user.id,
-                message=f"⏰ Tarea próxima: {t.title} vence mañana"
-            )
+            messages.append(f"⏰ Tarea próxima: {t.title} vence mañana")
         elif days_until_due == 0:
-            create_notification(
-                db=db,
-                task_id=t.id,
-                user_id=current_user.id,
-                message=f"🚨 Tarea vence hoy: {t.title}"
-            )
+            messages.append(f"🚨 Tarea vence hoy: {t.title}")
         elif days_until_due < 0:
-            create_notification(
-                db=db,
-                task_id=t.id,
-                user_id=current_user.id,
-                message=f"🔴 Tarea vencida: {t.title}"
-            )
+            messages.append(f"🔴 Tarea vencida: {t.title}")
     
     elif any(key in data for key in ['title', 'description', 'due_time', 'priority']):
-        create_notification(
-            db=db,
-            task_id=t.id,
-            user_id=current_user.id,
-            message=f"✏️ Tarea actualizada: {t.title}"
-        )
+        messages.append(f"✏️ Tarea actualizada: {t.title}")
 
-    return t
+    return messages
 
 @router.delete("/eliminarTarea/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task(
@@ -380,13 +461,436 @@ def delete_task(
     if t.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="No tienes permiso para eliminar esta tarea")
     
-    create_notification(
-        db=db,
-        task_id=task_id,
-        user_id=current_user.id,
-        message=f"🗑️ Tarea eliminada: {t.title}"
-    )
-    
+    # users antes que notifications (orden de bloqueo de core/unread_counter.py)
+    data_version.bump(db, current_user.id)
+    version = data_version.current(db, current_user.id)
+    # Sin notificación de eliminación: tiene FK a la tarea y se borraría con ella.
+    # Las no leídas se cuentan al borrarlas (el DELETE ve la versión vigente)
+    unread_deleted = db.execute(delete(models.Notification).where(
+        models.Notification.task_id == task_id,
+        models.Notification.is_read == False
+    )).rowcount
+    unread_counter.adjust(db, current_user.id, -unread_deleted)
+    db.execute(delete(models.Notification).where(models.Notification.task_id == task_id))
     db.delete(t)
     db.commit()
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+    priority_index.record_write(current_user.id, version, deleted=[task_id])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/tasks/bulk", response_model=schemas.BulkTaskResponse)
+def bulk_tasks(
+    request: Request,
+    payload: schemas.BulkTaskRequest,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """
+    Aplica operaciones create/update/delete mezcladas en una sola transacción.
+    Mismas validaciones que /crearTarea y /editarTarea; el resultado se informa
+    por elemento. Con atomic=true, si alguna falla no se aplica ninguna.
+    """
+    operations = payload.operations
+    results: List[Optional[dict]] = [None] * len(operations)
+    # Sin microsegundos: DATETIME de MySQL los redondea y created_at se usa para releer los ids
+    now = datetime.utcnow().replace(microsecond=0)
+
+    # Todas las tareas afectadas en una sola consulta
+    target_ids = {op.id for op in operations if op.op != schemas.BulkOperationType.create and op.id is not None}
+    targets = {}
+    if target_ids:
+        targets = {t.id: t for t in db.query(models.Task).filter(models.Task.id.in_(target_ids))}
+
+    created = []  # (index, fila para el INSERT)
+    updated = []  # (index, task, mensajes)
+    deleted = {}  # task_id -> index
+
+    for index, op in enumerate(operations):
+        try:
+            if op.op == schemas.BulkOperationType.create:
+                item = schemas.TaskCreate.parse_obj(op.data or {})
+                created.append((index, _task_row(item, current_user.id, now)))
+                continue
+
+            t = targets.get(op.id)
+            if t is None or t.id in deleted:
+                raise HTTPException(status_code=404, detail="not found")
+            if t.user_id != current_user.id:
+                raise HTTPException(status_code=403, detail="No tienes permiso para modificar esta tarea")
+
+            if op.op == schemas.BulkOperationType.update:
+                data = schemas.TaskUpdate.parse_obj(op.data or {}).dict(exclude_unset=True)
+                old_status = t.status
+                old_completed = t.is_completed
+                _apply_task_update(t, data)
+                updated.append((index, t, _update_notification_messages(t, data, old_status, old_completed)))
+            else:
+                deleted[t.id] = index
+        except ValidationError as exc:
+            results[index] = {"index": index, "op": op.op, "status": "error", "id": op.id, "error": exc.errors()}
+        except HTTPException as exc:
+            results[index] = {"index": index, "op": op.op, "status": "error", "id": op.id, "error": exc.detail}
+
+    failed = sum(1 for result in results if result is not None)
+    if payload.atomic and failed:
+        db.rollback()
+        for index, op in enumerate(operations):
+            if results[index] is None:
+                results[index] = {"index": index, "op": op.op, "status": "skipped", "id": op.id}
+        return {"results": results, "succeeded": 0, "failed": failed}
+
+    # Las ediciones se envían como un único UPDATE por id (executemany) en vez
+    # de un flush por tarea: se leen los valores ya aplicados y las instancias
+    # salen de la sesión antes de que un autoflush las escriba una a una
+    update_rows = [
+        {"id": t.id, **{column: getattr(t, column) for column in BULK_UPDATE_COLUMNS}}
+        for _, t, _ in updated if t.id not in deleted
+    ]
+    for _, t, _ in updated:
+        db.expunge(t)
+
+    if created or updated or deleted:
+        # Primero: bloquea la fila del usuario hasta el commit, así ninguna otra
+        # alta suya se confirma entre el INSERT y la lectura de los ids
+        data_version.bump(db, current_user.id)
+        version = data_version.current(db, current_user.id)
+
+    saved = {}  # task_id -> copia transitoria, para el índice de prioridad
+    if created:
+        new_ids = _insert_tasks(db, [row for _, row in created], current_user.id, now)
+        if len(new_ids) != len(created):
+            db.rollback()
+            raise HTTPException(status_code=409, detail="No se pudieron confirmar las tareas creadas; reintenta la operación")
+        for (index, row), task_id in zip(created, new_ids):
+            task = saved[task_id] = models.Task(id=task_id, **row)
+            create_notification(db, task.id, current_user.id, f"📝 Tarea creada: {task.title}")
+            results[index] = {"index": index, "op": schemas.BulkOperationType.create, "status": "ok", "id": task.id, "task": schemas.TaskOut.from_orm(task)}
+    if update_rows:
+        db.execute(update(models.Task), update_rows)
+    for index, t, messages in updated:
+        results[index] = {"index": index, "op": schemas.BulkOperationType.update, "status": "ok", "id": t.id}
+        if t.id in deleted:
+            continue
+        saved[t.id] = _priority_snapshot(t)
+        results[index]["task"] = schemas.TaskOut.from_orm(t)
+        for message in messages:
+            create_notification(db, t.id, current_user.id, message)
+    for task_id, index in deleted.items():
+        results[index] = {"index": index, "op": schemas.BulkOperationType.delete, "status": "ok", "id": task_id}
+
+    if deleted:
+        # Las notificaciones de la tarea se borran con ella (igual que el cascade de /eliminarTarea)
+        deleted_ids = list(deleted)
+        unread_deleted = db.execute(delete(models.Notification).where(
+            models.Notification.task_id.in_(deleted_ids),
+            models.Notification.is_read == False
+        )).rowcount
+        unread_counter.adjust(db, current_user.id, -unread_deleted)
+        db.execute(delete(models.Notification).where(models.Notification.task_id.in_(deleted_ids)))
+        db.execute(delete(models.Task).where(models.Task.id.in_(deleted_ids)))
+    db.commit()
+
+    if created or updated or deleted:
+        priority_index.record_write(current_user.id, version, saved=saved.values(), deleted=deleted)
+
+    return {"results": results, "succeeded": len(operations) - failed, "failed": failed}
+
+# Columnas que puede cambiar _apply_task_update
+BULK_UPDATE_COLUMNS = (
+    "title", "description", "due_date", "due_time", "priority", "important", "category_id",
+    "is_completed", "status", "completed_at", "updated_at", "priority_rank", "due_sort_key",
+)
+
+def _insert_tasks(db: Session, rows: List[dict], user_id: int, created_at: datetime) -> List[int]:
+    """
+    Inserta las filas en un solo INSERT (executemany) y devuelve sus ids en el
+    mismo orden: los más altos del usuario con este created_at (la fila de users
+    bloqueada por data_version.bump impide altas concurrentes). RETURNING con
+    orden garantizado no sirve aquí: SQLAlchemy lo degrada a un INSERT por fila.
+    """
+    db.execute(insert(models.Task), rows)
+    return db.execute(
+        select(models.Task.id)
+        .where(models.Task.user_id == user_id, models.Task.created_at == created_at)
+        .order_by(models.Task.id.desc())
+        .limit(len(rows))
+    ).scalars().all()[::-1]
+
+EXPORT_BATCH_SIZE = int(os.getenv("TASK_EXPORT_BATCH_SIZE", 500))
+EXPORT_MEDIA_TYPES = {
+    schemas.ExportFormat.ndjson: "application/x-ndjson",
+    schemas.ExportFormat.csv: "text/csv",
+}
+
+@router.get("/tasks/export")
+def export_tasks(
+    request: Request,
+    format: schemas.ExportFormat = Query(schemas.ExportFormat.ndjson, description="ndjson o csv"),
+    q: Optional[str] = Query(None),
+    status: Optional[schemas.TaskStatus] = Query(None),
+    important: Optional[bool] = Query(None),
+    category_id: Optional[int] = Query(None),
+    sort: Optional[str] = Query("created_at:desc", description="Ordenar por campo:dirección (ej: 'title:asc')"),
+    use_priority_queue: bool = Query(False, description="Exportar en orden de prioridad"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """
+    Exporta todas las tareas del usuario (mismos filtros que /listarTareas).
+    Las filas se leen con un cursor del servidor (yield_per) y se envían por
+    lotes, así la memoria no depende de la cantidad de tareas.
+    """
+    query = db.query(models.Task).filter(models.Task.user_id == current_user.id)
+    query = _apply_task_filters(query, db, q, status, important, category_id)
+    _, sort_key = _list_sort_key(None if sort == "relevance" else sort, use_priority_queue)
+    query = query.order_by(*order_by_clauses(sort_key))
+    rows = serialization.task_rows.with_columns(query).yield_per(EXPORT_BATCH_SIZE)
+
+    encode = _export_csv if format == schemas.ExportFormat.csv else _export_ndjson
+    filename = f"tareas.{format.value}"
+    return StreamingResponse(
+        encode(rows),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def _export_records(rows):
+    """Filas con la forma de TaskOut, con is_overdue calculado"""
+    for row in rows:
+        record = serialization.task_rows.encode_row(row)
+        record["is_overdue"] = _is_overdue_from_values(record["due_date"], record["status"])
+        yield record
+
+def _export_ndjson(rows):
+    batch = []
+    for record in _export_records(rows):
+        batch.append(serialization.dumps(record))
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+def _csv_value(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+def _export_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(serialization.task_rows.fields)
+    count = 0
+    for record in _export_records(rows):
+        writer.writerow([_csv_value(value) for value in record.values()])
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+IMPORT_BATCH_SIZE = int(os.getenv("TASK_IMPORT_BATCH_SIZE", 1000))
+IMPORT_MAX_ERRORS = int(os.getenv("TASK_IMPORT_MAX_ERRORS", 1000))
+
+@router.post("/tasks/import", response_model=schemas.TaskImportResponse)
+def import_tasks(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[schemas.ExportFormat] = Query(None, description="ndjson o csv (por defecto según la extensión del archivo)"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """
+    Importa tareas desde CSV o NDJSON (p. ej. lo generado por /tasks/export).
+    El archivo se lee fila a fila, cada fila se valida con TaskCreate y se
+    inserta en lotes (executemany) de TASK_IMPORT_BATCH_SIZE, con un commit
+    por lote. La columna opcional `category` (nombre) se resuelve a
+    category_id; las categorías que no existen se crean.
+    El archivo debe estar en UTF-8: si no lo está se rechaza entero con 400
+    antes de insertar nada.
+    No genera una notificación por tarea importada.
+    """
+    _require_utf8(file.file)
+    if format is None:
+        is_csv = (file.filename or "").lower().endswith(".csv")
+        format = schemas.ExportFormat.csv if is_csv else schemas.ExportFormat.ndjson
+    records = _import_csv(file.file) if format == schemas.ExportFormat.csv else _import_ndjson(file.file)
+
+    now = datetime.utcnow()
+    categories = {}  # nombre -> id, solo durante esta importación
+    summary = {"inserted": 0, "failed": 0, "categories_created": 0, "errors": [], "errors_truncated": False}
+    batch = []
+
+    def fail(row_number, error):
+        summary["failed"] += 1
+        if len(summary["errors"]) < IMPORT_MAX_ERRORS:
+            summary["errors"].append({"row": row_number, "error": error})
+        else:
+            summary["errors_truncated"] = True
+
+    def flush():
+        db.execute(insert(models.Task), batch)
+        data_version.bump(db, current_user.id)
+        db.commit()
+        summary["inserted"] += len(batch)
+        batch.clear()
+
+    for row_number, record in records:
+        if isinstance(record, str):
+            fail(row_number, record)
+            continue
+        category_name = record.pop("category", None)
+        if category_name is not None and not (isinstance(category_name, str) and 0 < len(category_name.strip()) <= 100):
+            fail(row_number, "category debe ser un nombre de 1 a 100 caracteres")
+            continue
+        try:
+            item = schemas.TaskCreate.parse_obj(record)
+        except ValidationError as exc:
+            fail(row_number, exc.errors())
+            continue
+
+        values = _task_row(item, current_user.id, now)
+        if category_name and values["category_id"] is None:
+            values["category_id"] = _import_category_id(db, categories, category_name, current_user.id, summary)
+        batch.append(values)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush()
+
+    if batch:
+        flush()
+    elif summary["categories_created"]:
+        db.commit()
+    if summary["inserted"]:
+        priority_index.invalidate(current_user.id)
+    return summary
+
+def _import_category_id(db: Session, categories: dict, name: str, user_id: int, summary: dict) -> int:
+    """Resuelve el nombre de categoría con la caché de la importación (la crea si no existe)"""
+    name = name.strip()
+    category_id = categories.get(name)
+    if category_id is None:
+        category = db.query(models.Category).filter(
+            models.Category.user_id == user_id,
+            models.Category.name == name
+        ).first()
+        if category is None:
+            category = models.Category(name=name, user_id=user_id)
+            db.add(category)
+            db.flush()
+            summary["categories_created"] += 1
+        category_id = categories[name] = category.id
+    return category_id
+
+def _require_utf8(raw_file):
+    """Recorre el archivo por bloques y lo rebobina; 400 si no es UTF-8 válido"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    line = 1
+    try:
+        for chunk in iter(lambda: raw_file.read(64 * 1024), b""):
+            decoder.decode(chunk)
+            line += chunk.count(b"\n")
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        line += exc.object[:exc.start].count(b"\n")
+        raise HTTPException(status_code=400, detail=f"El archivo debe estar codificado en UTF-8 (línea {line})")
+    raw_file.seek(0)
+
+def _text_lines(raw_file):
+    """Líneas decodificadas del archivo subido, sin cargarlo entero en memoria"""
+    first = True
+    for line in raw_file:
+        yield line.decode("utf-8-sig" if first else "utf-8")
+        first = False
+
+def _import_ndjson(raw_file):
+    """(número de línea, dict o mensaje de error) por cada línea no vacía"""
+    for row_number, line in enumerate(_text_lines(raw_file), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row_number, "JSON inválido"
+            continue
+        yield row_number, record if isinstance(record, dict) else "Se esperaba un objeto JSON"
+
+def _import_csv(raw_file):
+    """(número de línea, dict) por fila; las celdas vacías se omiten (toman el default)"""
+    reader = csv.DictReader(_text_lines(raw_file))
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+def _count_if(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+@router.get("/tasks/stats", response_model=schemas.TaskStatsResponse)
+def get_task_stats(
+    request: Request,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    """
+    Conteos por estado, prioridad y categoría, vencidas y que vencen esta
+    semana, en una sola consulta (GROUP BY categoría + sumas condicionales).
+    Se guarda en caché por usuario junto con su data_version: cualquier
+    escritura la invalida, también las hechas en otro worker.
+    """
+    today = date.today()
+    version = data_version.current(db, current_user.id)
+    cached = stats_cache.get(current_user.id)
+    if cached is not None and cached[0] == (version, today):
+        return cached[1]
+
+    task = models.Task
+    open_task = task.status != "completed"
+    end_of_week = today + timedelta(days=6 - today.weekday())
+    columns = [
+        task.category_id,
+        models.Category.name,
+        func.count(task.id),
+        _count_if(task.important == True),
+        _count_if(and_(task.due_date < today, open_task)),
+        _count_if(and_(task.due_date >= today, task.due_date <= end_of_week, open_task)),
+    ]
+    columns += [_count_if(task.status == value.value) for value in schemas.TaskStatus]
+    columns += [_count_if(task.priority == value.value) for value in schemas.TaskPriority]
+
+    rows = (
+        db.query(*columns)
+        .outerjoin(models.Category, models.Category.id == task.category_id)
+        .filter(task.user_id == current_user.id)
+        .group_by(task.category_id, models.Category.name)
+        .all()
+    )
+
+    statuses = [value.value for value in schemas.TaskStatus]
+    priorities = [value.value for value in schemas.TaskPriority]
+    stats = {
+        "total": 0,
+        "by_status": dict.fromkeys(statuses, 0),
+        "by_priority": dict.fromkeys(priorities, 0),
+        "by_category": [],
+        "important": 0,
+        "overdue": 0,
+        "due_this_week": 0,
+    }
+    for category_id, name, total, important, overdue, due_this_week, *counts in rows:
+        stats["total"] += total
+        stats["important"] += int(important or 0)
+        stats["overdue"] += int(overdue or 0)
+        stats["due_this_week"] += int(due_this_week or 0)
+        by_status = dict(zip(statuses, counts[:len(statuses)]))
+        for key, value in by_status.items():
+            stats["by_status"][key] += int(value or 0)
+        for key, value in zip(priorities, counts[len(statuses):]):
+            stats["by_priority"][key] += int(value or 0)
+        stats["by_category"].append({
+            "category_id": category_id,
+            "name": name,
+            "total": total,
+            "completed": int(by_status["completed"] or 0),
+        })
+    stats["by_category"].sort(key=lambda item: (item["category_id"] is None, item["category_id"] or 0))
+
+    stats_cache.set(current_user.id, ((version, today), stats))
+    return stats
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from app.core import database, security
+from app.core import data_version, database, security
 from app.models import models
 from app.schemas import user as user_schemas
-from app.core.auth import get_current_user_with_rate_limit
+from app.core.auth import get_current_user_with_rate_limit, invalidate_user_cache
+from app.core.priority_index import priority_index
 
 router = APIRouter()
 
 @router.get("/user", response_model=user_schemas.UserOut)
-def get_current_user_profile(current_user: models.User = Depends(get_current_user_with_rate_limit)):
+def get_current_user_profile(
+    request: Request,
+    response: Response,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(get_current_user_with_rate_limit)
+):
+    etag, not_modified = data_version.check(request, db, current_user.id)
+    if not_modified:
+        return not_modified
+    data_version.set_headers(response, etag)
     return current_user
 
 @router.put("/user", response_model=user_schemas.UserOut)
@@ -21,19 +31,19 @@ def update_current_user_profile(
         print(f"🔍 Recibiendo actualización para usuario: {current_user.id}")
         print(f"📦 Payload recibido: {payload.dict()}")
         
-        # Verificar contraseña actual antes de cualquier modificación
-        if not security.verify_password(payload.current_password, current_user.hashed_password):
+        # Obtener el usuario fresco de la base de datos
+        user = db.query(models.User).filter(models.User.id == current_user.id).first()
+        if not user:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+        # Verificar contraseña actual (de la fila fresca, no de la caché) antes de cualquier modificación
+        if not security.verify_password(payload.current_password, user.hashed_password):
             print("❌ Contraseña actual incorrecta")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, 
                 detail="La contraseña actual es incorrecta"
             )
 
-        # Obtener el usuario fresco de la base de datos
-        user = db.query(models.User).filter(models.User.id == current_user.id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-
         # Verificar si el email ya está en uso por otro usuario
         if payload.email and payload.email != user.email:
             existing = db.query(models.User).filter(
@@ -68,8 +78,10 @@ def update_current_user_profile(
 
         # Guardar cambios
         db.add(user)
+        data_version.bump(db, user.id)
         db.commit()
         db.refresh(user)
+        invalidate_user_cache(user.id)
         
         print(f"✅ Usuario actualizado correctamente: {user.name}, {user.email}")
         return user
@@ -92,21 +104,23 @@ def delete_current_user_profile(
     current_user: models.User = Depends(get_current_user_with_rate_limit)
 ):
     try:
-        # Verificar contraseña antes de eliminar la cuenta
-        if not security.verify_password(payload.current_password, current_user.hashed_password):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail="La contraseña actual es incorrecta"
-            )
-
         # Obtener el usuario fresco de la base de datos
         user_to_delete = db.query(models.User).filter(models.User.id == current_user.id).first()
         if not user_to_delete:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
+        # Verificar contraseña (de la fila fresca, no de la caché) antes de eliminar la cuenta
+        if not security.verify_password(payload.current_password, user_to_delete.hashed_password):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, 
+                detail="La contraseña actual es incorrecta"
+            )
+
         # Eliminar usuario
         db.delete(user_to_delete)
         db.commit()
+        invalidate_user_cache(user_to_delete.id)
+        priority_index.invalidate(user_to_delete.id)
         
         print(f"✅ Usuario {user_to_delete.email} eliminado correctamente")
         return None
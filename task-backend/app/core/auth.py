@@ -1,59 +1,110 @@
-from fastapi import Depends, HTTPException, status, Request
+import hashlib
+import os
+import secrets
+import time
+from datetime import timedelta
+from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from app.core import database, security
-from app.core.rate_limiting import api_rate_limiter
+from app.core.cache import token_cache, used_stream_tickets, user_cache
 from app.models import models
 
 bearer_scheme = HTTPBearer()
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Misma dependencia que usan los routers: FastAPI la resuelve una sola vez por
+# request, así auth y el endpoint comparten una única sesión/conexión del pool.
+get_db = database.get_db
+
+# Sin hashed_password: las verificaciones de contraseña leen siempre la fila de la DB
+USER_CACHE_COLUMNS = ("id", "name", "email", "created_at")
+
+# Tickets de /notifications/stream: EventSource no puede enviar Authorization y
+# el JWT de acceso no debe ir en la URL (queda en los access logs). El ticket es
+# un JWT de vida corta, válido solo para abrir el stream y de un solo uso (por
+# proceso; entre workers lo acota la expiración).
+STREAM_TICKET_SCOPE = "notification-stream"
+STREAM_TICKET_TTL_SECONDS = int(os.getenv("NOTIFICATION_STREAM_TICKET_TTL_SECONDS", 30))
+
+def _decode_token(token: str) -> dict:
+    """Decodifica el JWT reutilizando los claims en caché hasta su `exp`"""
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(token_key)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(token_key, payload, ttl=exp - time.time())
+    return payload
+
+def _load_user(db: Session, user_id: int):
+    """
+    Obtiene el usuario desde la caché o la DB.
+    Se cachean solo los valores de columnas; cada request recibe una instancia
+    transitoria propia para no compartir objetos ORM entre sesiones/hilos.
+    """
+    data = user_cache.get(user_id)
+    if data is None:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if not user:
+            return None
+        data = {column: getattr(user, column) for column in USER_CACHE_COLUMNS}
+        user_cache.set(user_id, data)
+        return user
+    return models.User(**data)
+
+def invalidate_user_cache(user_id: int):
+    user_cache.invalidate(user_id)
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
-    token = credentials.credentials
+    return authenticate_token(credentials.credentials, db)
+
+def authenticate_token(token: str, db: Session):
+    """Valida el JWT y devuelve el usuario (401 si no es válido)"""
     try:
-        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+        payload = _decode_token(token)
         user_id: str = payload.get("sub")
-        if user_id is None:
+        # Los tickets del stream (con scope) no sirven como token de acceso
+        if user_id is None or payload.get("scope") is not None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
     
-    # buscar usuario en DB
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
+    # buscar usuario (caché en memoria, DB si no está)
+    user = _load_user(db, int(user_id))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
+    return user
+
+def create_stream_ticket(user_id: int) -> str:
+    return security.create_access_token(
+        {"sub": str(user_id), "scope": STREAM_TICKET_SCOPE, "jti": secrets.token_urlsafe(16)},
+        expires_delta=timedelta(seconds=STREAM_TICKET_TTL_SECONDS),
+    )
+
+def redeem_stream_ticket(ticket: str, db: Session):
+    """Valida el ticket, lo marca como usado y devuelve el usuario (401 si no sirve)"""
+    try:
+        payload = jwt.decode(ticket, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ticket inválido")
+    if payload.get("scope") != STREAM_TICKET_SCOPE or not payload.get("jti") or payload.get("sub") is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ticket inválido")
+    if not used_stream_tickets.add(payload["jti"], True, ttl=payload["exp"] - time.time()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ticket ya utilizado")
+
+    user = _load_user(db, int(payload["sub"]))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
     return user
 
 def get_current_user_with_rate_limit(
-    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), 
     db: Session = Depends(get_db)
 ):
-    # Primero obtener el usuario (esto valida el token)
-    user = get_current_user(credentials, db)
-    
-    # Usar user_id + IP como clave única para el rate limiting
-    client_ip = request.client.host
-    key = f"{user.id}:{client_ip}"
-    
-    # Verificar rate limiting para API autenticada
-    if api_rate_limiter.is_blocked(key):
-        block_time = api_rate_limiter.get_block_time_remaining(key)
-        retry_after = int(block_time)
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Límite de solicitudes excedido. Espere {retry_after} segundos.",
-            headers={"Retry-After": str(retry_after)}
-        )
-    
-    # Registrar la solicitud
-    api_rate_limiter.record_request(key)
-    
-    return user
\ No newline at end of file
+    # El rate limit se aplica antes, en RateLimitMiddleware (app/main.py),
+    # para rechazar sin decodificar el JWT ni consultar la DB.
+    return get_current_user(credentials, db)
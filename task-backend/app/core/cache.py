@@ -0,0 +1,115 @@
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class TTLCache:
+    """
+    Caché en memoria acotada con expiración por entrada y desalojo LRU.
+    Segura para hilos: los handlers sync de FastAPI corren en un threadpool.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self.entries[key]
+                self.misses += 1
+                return default
+
+            # Marcar como usada recientemente
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Guarda un valor; `ttl` sobrescribe el TTL por defecto (nunca lo amplía)"""
+        if ttl is None or ttl > self.ttl_seconds:
+            ttl = self.ttl_seconds
+        if ttl <= 0:
+            return
+
+        with self.lock:
+            self.entries[key] = (time.time() + ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """Como set(), pero solo si la clave no está (o expiró); False si ya estaba"""
+        if ttl is None or ttl > self.ttl_seconds:
+            ttl = self.ttl_seconds
+        if ttl <= 0:
+            return True
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                return False
+            self.entries[key] = (time.time() + ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key: Hashable):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """Contadores para dimensionar la caché"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self.entries)
+
+# Claims de JWT ya decodificados, indexados por digest del token (expiran con `exp`)
+token_max_entries = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000))
+token_cache = TTLCache(max_entries=token_max_entries, ttl_seconds=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", 3600)))
+
+# Filas de usuario autenticado, indexadas por user_id
+user_max_entries = int(os.getenv("USER_CACHE_MAX_ENTRIES", 5000))
+user_cache = TTLCache(max_entries=user_max_entries, ttl_seconds=float(os.getenv("USER_CACHE_TTL_SECONDS", 60)))
+
+# jti de los tickets de /notifications/stream ya usados (expiran con el ticket)
+stream_ticket_max_entries = int(os.getenv("STREAM_TICKET_CACHE_MAX_ENTRIES", 10000))
+used_stream_tickets = TTLCache(max_entries=stream_ticket_max_entries, ttl_seconds=3600)
+
+# Agregados de /tasks/stats por user_id, válidos mientras no cambie users.data_version
+stats_max_entries = int(os.getenv("TASK_STATS_CACHE_MAX_ENTRIES", 5000))
+stats_cache = TTLCache(max_entries=stats_max_entries, ttl_seconds=float(os.getenv("TASK_STATS_CACHE_TTL_SECONDS", 3600)))
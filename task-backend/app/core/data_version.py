@@ -0,0 +1,68 @@
+import hashlib
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models import models
+
+# Versión de datos por usuario para ETag / If-None-Match.
+# users.data_version sube en la misma transacción que cada escritura de tareas,
+# categorías y notificaciones (bump), así es consistente entre workers. Los
+# endpoints de lectura consultan solo esa columna y responden 304 si el tag coincide.
+
+CACHE_CONTROL = "private, no-cache"
+
+# Usuarios con versión incrementada en la transacción en curso (session.info),
+# para avisar a sus conexiones de /notifications/stream después del commit
+CHANGED_USERS_KEY = "changed_users"
+
+def bump(db: Session, user_id: int):
+    """Incrementa la versión; llamar antes del commit de la escritura"""
+    db.info.setdefault(CHANGED_USERS_KEY, set()).add(user_id)
+    db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(data_version=models.User.data_version + 1)
+    )
+
+def current(db: Session, user_id: int) -> int:
+    return db.execute(select(models.User.data_version).where(models.User.id == user_id)).scalar() or 0
+
+def etag_for(request: Request, user_id: int, version: int) -> str:
+    """ETag débil: usuario + versión + ruta y query params normalizados"""
+    params = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(f"{request.url.path}?{params}".encode(), digest_size=8).hexdigest()
+    return f'W/"{user_id}-{version}-{digest}"'
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Comparación débil (RFC 7232): se ignora el prefijo W/
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+def check(request: Request, db: Session, user_id: int) -> Tuple[str, Optional[Response]]:
+    """
+    Devuelve (etag, respuesta 304 o None). La versión se lee antes de la
+    consulta del listado: si hay una escritura en medio el tag queda viejo y
+    la siguiente petición simplemente recibe 200.
+    """
+    etag = etag_for(request, user_id, current(db, user_id))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return etag, Response(status_code=304, headers=headers)
+    return etag, None
+
+def set_headers(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,81 @@
+from typing import Iterable, List, Optional, Set
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Query, joinedload, load_only
+from app.models import models
+from app.schemas import tasks as task_schemas
+
+# Campos de TaskOut que existen como columnas (el resto, p. ej. is_overdue, son calculados)
+TASK_FIELDS = list(task_schemas.TaskOut.__fields__)
+TASK_COLUMNS = set(models.Task.__table__.columns.keys())
+CATEGORY_SUMMARY_COLUMNS = ("id", "name", "color", "icon")
+EXPANSIONS = {"category"}
+
+class TaskView:
+    """
+    Proyección de tareas pedida con `fields=` y `expand=`.
+    Sin ninguno de los dos la respuesta es la de siempre (TaskOut completo).
+    """
+
+    def __init__(self, fields: Optional[str] = None, expand: Optional[str] = None):
+        self.fields = self._parse(fields, set(TASK_FIELDS), "fields")
+        self.expand = self._parse(expand, EXPANSIONS, "expand") or set()
+
+    @staticmethod
+    def _parse(value: Optional[str], allowed: Set[str], name: str) -> Optional[Set[str]]:
+        if not value:
+            return None
+        requested = {part.strip() for part in value.split(",") if part.strip()}
+        unknown = requested - allowed
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Valores no soportados en {name}: {', '.join(sorted(unknown))}"
+            )
+        return requested
+
+    @property
+    def is_default(self) -> bool:
+        return self.fields is None and not self.expand
+
+    def output_fields(self) -> List[str]:
+        if self.fields is None:
+            return TASK_FIELDS
+        return [field for field in TASK_FIELDS if field in self.fields]
+
+    def apply(self, query: Query, extra_columns: Iterable[str] = ()) -> Query:
+        """
+        Carga solo las columnas pedidas (+ id, user_id y `extra_columns`, que
+        el endpoint necesita para permisos u ordenamiento) y, con
+        expand=category, la categoría en el mismo SELECT (JOIN).
+        """
+        if self.fields is not None:
+            columns = (self.fields & TASK_COLUMNS) | {"id", "user_id"} | set(extra_columns)
+            query = query.options(load_only(*(getattr(models.Task, column) for column in columns)))
+        if "category" in self.expand:
+            query = query.options(
+                joinedload(models.Task.category).load_only(
+                    *(getattr(models.Category, column) for column in CATEGORY_SUMMARY_COLUMNS)
+                )
+            )
+        return query
+
+    def serialize(self, task) -> dict:
+        data = {}
+        for field in self.output_fields():
+            if field in TASK_COLUMNS:
+                data[field] = getattr(task, field)
+            else:
+                data[field] = task_schemas.TaskOut.__fields__[field].default
+        if "category" in self.expand:
+            category = task.category
+            data["category"] = (
+                {column: getattr(category, column) for column in CATEGORY_SUMMARY_COLUMNS}
+                if category is not None else None
+            )
+        return data
+
+    def response(self, content) -> JSONResponse:
+        """Respuesta ya serializada (evita validar contra TaskOut completo)"""
+        return JSONResponse(jsonable_encoder(content))
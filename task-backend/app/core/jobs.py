@@ -0,0 +1,90 @@
+import os
+from contextlib import contextmanager
+from threading import Event, Thread
+from typing import Callable
+from dotenv import load_dotenv
+from sqlalchemy import text
+from app.core import database
+
+load_dotenv()
+
+# false: este proceso no arranca tareas de mantenimiento (p. ej. todos los
+# workers salvo uno cuando la DB no es MySQL y no hay lock compartido)
+MAINTENANCE_JOBS_ENABLED = os.getenv("MAINTENANCE_JOBS_ENABLED", "true").lower() == "true"
+# Prefijo de los locks con nombre de MySQL (máx. 64 caracteres en total)
+JOB_LOCK_PREFIX = os.getenv("MAINTENANCE_JOB_LOCK_PREFIX", "gestor_tareas")
+
+@contextmanager
+def job_lock(name: str):
+    """
+    Lock con nombre en la DB (GET_LOCK de MySQL, sin espera): con varios
+    workers solo uno corre la tarea en cada intervalo; el resto la salta.
+    En otros motores no hay lock entre procesos y siempre se obtiene.
+    """
+    if database.engine.dialect.name != "mysql":
+        yield True
+        return
+    lock_name = f"{JOB_LOCK_PREFIX}:{name}"
+    with database.engine.connect() as connection:
+        acquired = connection.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": lock_name}).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": lock_name})
+
+class PeriodicJob:
+    """
+    Tarea de mantenimiento que corre cada `interval_seconds` en un hilo daemon
+    (mismo esquema que SweeperMixin en rate_limiting.py). interval <= 0 la desactiva.
+    Con exclusive=True cada corrida toma job_lock(name) y se salta si otro
+    proceso lo tiene.
+    """
+
+    def __init__(self, name: str, fn: Callable[[], object], interval_seconds: float, exclusive: bool = False):
+        self.name = name
+        self.fn = fn
+        self.interval_seconds = interval_seconds
+        self.exclusive = exclusive
+        self.last_result = None
+        self.skipped = 0
+        self._thread = None
+        self._stop = None
+
+    def _run(self):
+        if not self.exclusive:
+            return self.fn()
+        with job_lock(self.name) as acquired:
+            if not acquired:
+                self.skipped += 1
+                return self.last_result
+            return self.fn()
+
+    def run_once(self):
+        try:
+            self.last_result = self._run()
+        except Exception as e:
+            # Un fallo no detiene el hilo: se reintenta en el próximo intervalo
+            print(f"❌ Error en la tarea {self.name}: {e}")
+        return self.last_result
+
+    def start(self):
+        if not MAINTENANCE_JOBS_ENABLED or self.interval_seconds <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop = Event()
+
+        def run():
+            while not self._stop.wait(self.interval_seconds):
+                self.run_once()
+
+        self._thread = Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
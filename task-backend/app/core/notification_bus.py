@@ -0,0 +1,163 @@
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.core import data_version
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+load_dotenv()
+
+class Subscription:
+    """
+    Conexión abierta de /notifications/stream. No hay cola de mensajes: solo
+    una señal (asyncio.Event) que la conexión atiende releyendo los cambios
+    desde la DB. Mientras el cliente está ocupado las señales se fusionan, así
+    un cliente lento nunca acumula memoria en el servidor (backpressure).
+    """
+    __slots__ = ("user_id", "loop", "event")
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    def notify(self):
+        # Se llama desde hilos del threadpool o del backend de fan-out
+        self.loop.call_soon_threadsafe(self.event.set)
+
+class NotificationBroker:
+    """Pub/sub en proceso por user_id, con tope de conexiones total y por usuario"""
+
+    def __init__(self, max_connections: int, max_per_user: int):
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self.connections = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Optional[Subscription]:
+        """None si se alcanzó algún tope de conexiones"""
+        with self.lock:
+            if self.connections >= self.max_connections or len(self.subscribers.get(user_id, ())) >= self.max_per_user:
+                self.rejected += 1
+                return None
+            subscription = Subscription(user_id, asyncio.get_running_loop())
+            self.subscribers[user_id].add(subscription)
+            self.connections += 1
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(subscription.user_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscribers[subscription.user_id]
+            self.connections -= 1
+
+    def deliver(self, user_id: int):
+        """Despierta las conexiones locales del usuario"""
+        with self.lock:
+            subscriptions = list(self.subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.notify()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "connections": self.connections,
+                "users": len(self.subscribers),
+                "max_connections": self.max_connections,
+                "rejected": self.rejected,
+            }
+
+class MemoryFanout:
+    """Un solo proceso: publica directo en el broker local"""
+
+    def __init__(self, broker: NotificationBroker):
+        self.broker = broker
+
+    def publish(self, user_id: int):
+        self.broker.deliver(user_id)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+class RedisFanout:
+    """
+    Varios workers/instancias: PUBLISH en un canal de Redis y un hilo por
+    proceso reenvía cada aviso a su broker local.
+    """
+    CHANNEL = "notifications:changed"
+
+    def __init__(self, broker: NotificationBroker, url: str):
+        if redis is None:
+            raise RuntimeError("NOTIFICATION_FANOUT_BACKEND=redis requiere el paquete 'redis'")
+        self.broker = broker
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = None
+        self.thread = None
+
+    def publish(self, user_id: int):
+        self.client.publish(self.CHANNEL, str(user_id))
+
+    def _listen(self):
+        for message in self.pubsub.listen():
+            try:
+                self.broker.deliver(int(message["data"]))
+            except (TypeError, ValueError):
+                continue
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(self.CHANNEL)
+        self.thread = threading.Thread(target=self._listen, name="notification-fanout", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.pubsub is not None:
+            self.pubsub.close()
+        self.thread = None
+
+def create_fanout(broker: NotificationBroker):
+    """Backend de fan-out según NOTIFICATION_FANOUT_BACKEND (memory|redis)"""
+    backend = os.getenv("NOTIFICATION_FANOUT_BACKEND", "memory").lower()
+    if backend == "redis":
+        return RedisFanout(broker, os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return MemoryFanout(broker)
+
+notification_broker = NotificationBroker(
+    max_connections=int(os.getenv("NOTIFICATION_STREAM_MAX_CONNECTIONS", 1000)),
+    max_per_user=int(os.getenv("NOTIFICATION_STREAM_MAX_PER_USER", 5)),
+)
+notification_fanout = create_fanout(notification_broker)
+
+@event.listens_for(Session, "after_commit")
+def _publish_changed_users(session: Session):
+    # Toda escritura que sube data_version (tareas, notificaciones, ...) avisa
+    # a las conexiones del usuario; ellas deciden si hay algo nuevo que enviar
+    for user_id in session.info.pop(data_version.CHANGED_USERS_KEY, ()):
+        try:
+            notification_fanout.publish(user_id)
+        except Exception as e:
+            # El aviso es best-effort: la escritura ya está confirmada
+            print(f"❌ Error publicando cambios del usuario {user_id}: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session):
+    session.info.pop(data_version.CHANGED_USERS_KEY, None)
@@ -0,0 +1,39 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from app.core import unread_counter
+from app.models import models
+
+# Notificaciones pendientes de la transacción en curso (session.info). Se
+# insertan con un único INSERT multi-fila justo antes del commit, en el orden
+# en que se encolaron: se confirman junto con la escritura que las generó o
+# se descartan con ella, nunca por separado. created_at se fija aquí (no con
+# el server_default): en SQLite el default guarda otro formato de texto y el
+# cursor de /notifications compara mal.
+PENDING_KEY = "pending_notifications"
+
+def queue_notification(db: Session, task_id: int, user_id: int, message: str):
+    db.info.setdefault(PENDING_KEY, []).append({
+        "task_id": task_id,
+        "user_id": user_id,
+        "message": message,
+    })
+
+def pending_notifications(db: Session) -> list:
+    return db.info.get(PENDING_KEY, [])
+
+@event.listens_for(Session, "before_commit")
+def _insert_pending_notifications(session: Session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        # Primero los cambios del ORM (p. ej. la tarea recién creada)
+        session.flush()
+        now = datetime.utcnow()
+        session.execute(insert(models.Notification), [dict(row, created_at=now) for row in pending])
+        for user_id, count in Counter(row["user_id"] for row in pending).items():
+            unread_counter.adjust(session, user_id, count)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_notifications(session: Session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,174 @@
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Optional
+from sqlalchemy import and_, delete, false, or_, select
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.core import data_version, database, unread_counter
+from app.core.jobs import PeriodicJob
+from app.core.pagination import keyset_filter
+from app.models import models
+
+load_dotenv()
+
+# Retención de notificaciones: las leídas se purgan pasados READ_DAYS y las no
+# leídas pasados UNREAD_DAYS (0 desactiva cada regla). Lo purgado se compacta en
+# notification_archives (una fila por usuario con totales y rango de fechas).
+RETENTION_READ_DAYS = int(os.getenv("NOTIFICATION_RETENTION_READ_DAYS", 30))
+RETENTION_UNREAD_DAYS = int(os.getenv("NOTIFICATION_RETENTION_UNREAD_DAYS", 90))
+PURGE_BATCH_SIZE = int(os.getenv("NOTIFICATION_PURGE_BATCH_SIZE", 500))
+
+# Recorrido en el orden de ix_notifications_created
+PURGE_SORT_KEY = ((models.Notification.created_at, False), (models.Notification.id, False))
+PURGE_COLUMNS = (
+    models.Notification.id,
+    models.Notification.user_id,
+    models.Notification.is_read,
+    models.Notification.created_at,
+)
+
+_stats_lock = Lock()
+_totals = {"runs": 0, "rows_purged": 0, "read_purged": 0, "unread_purged": 0, "last_run": None}
+
+def _cutoff(days: int, now: datetime) -> Optional[datetime]:
+    return now - timedelta(days=days) if days > 0 else None
+
+def retention_filter(read_cutoff: Optional[datetime], unread_cutoff: Optional[datetime]):
+    """Predicado de notificaciones vencidas según su estado de lectura"""
+    clauses = []
+    if read_cutoff is not None:
+        clauses.append(and_(models.Notification.is_read == True, models.Notification.created_at < read_cutoff))
+    if unread_cutoff is not None:
+        clauses.append(and_(models.Notification.is_read == False, models.Notification.created_at < unread_cutoff))
+    return or_(*clauses) if clauses else false()
+
+def _archive(db: Session, user_id: int, rows: list, now: datetime):
+    """Acumula en el resumen del usuario las filas purgadas de un lote"""
+    archive = db.get(models.NotificationArchive, user_id)
+    if archive is None:
+        archive = models.NotificationArchive(user_id=user_id, archived_count=0, archived_unread=0)
+        db.add(archive)
+
+    oldest = min(created_at for _, created_at in rows)
+    newest = max(created_at for _, created_at in rows)
+    archive.archived_count += len(rows)
+    archive.archived_unread += sum(1 for is_read, _ in rows if not is_read)
+    if archive.oldest_created_at is None or oldest < archive.oldest_created_at:
+        archive.oldest_created_at = oldest
+    if archive.newest_created_at is None or newest > archive.newest_created_at:
+        archive.newest_created_at = newest
+    archive.last_archived_at = now
+
+def purge(
+    batch_size: int = PURGE_BATCH_SIZE,
+    read_days: int = RETENTION_READ_DAYS,
+    unread_days: int = RETENTION_UNREAD_DAYS,
+) -> dict:
+    """
+    Borra las notificaciones vencidas por lotes de `batch_size`, avanzando por
+    keyset sobre (created_at, id). Cada lote es una transacción corta: bloquea
+    los usuarios del lote y luego sus filas (orden de core/unread_counter.py),
+    las borra por id, descuenta el contador de no leídas, actualiza el resumen
+    archivado y hace commit, sin bloquear la tabla durante la purga.
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    read_cutoff = _cutoff(read_days, now)
+    unread_cutoff = _cutoff(unread_days, now)
+    metrics = {"rows_purged": 0, "read_purged": 0, "unread_purged": 0, "batches": 0, "users_affected": 0}
+
+    cutoffs = [c for c in (read_cutoff, unread_cutoff) if c is not None]
+    users = set()
+    last = None
+    while cutoffs:
+        with database.SessionLocal() as db:
+            query = (
+                select(*PURGE_COLUMNS)
+                .where(
+                    # cota por la fecha más reciente para que el índice acote el rango
+                    models.Notification.created_at < max(cutoffs),
+                    retention_filter(read_cutoff, unread_cutoff),
+                )
+                .order_by(models.Notification.created_at, models.Notification.id)
+                .limit(batch_size)
+            )
+            if last is not None:
+                query = query.where(keyset_filter(PURGE_SORT_KEY, last))
+            # Lectura sin bloqueo: solo define el lote
+            candidates = db.execute(query).all()
+            if not candidates:
+                break
+
+            # Primero users y después las filas del lote, releídas con su is_read vigente
+            unread_counter.lock_users(db, [row.user_id for row in candidates])
+            rows = db.execute(
+                select(*PURGE_COLUMNS)
+                .where(
+                    models.Notification.id.in_([row.id for row in candidates]),
+                    retention_filter(read_cutoff, unread_cutoff),
+                )
+                .with_for_update()
+            ).all()
+            if rows:
+                db.execute(
+                    delete(models.Notification)
+                    .where(models.Notification.id.in_([row.id for row in rows]))
+                    .execution_options(synchronize_session=False)
+                )
+            by_user = defaultdict(list)
+            for row in rows:
+                by_user[row.user_id].append((row.is_read, row.created_at))
+            for user_id, user_rows in by_user.items():
+                unread_counter.adjust(db, user_id, -sum(1 for is_read, _ in user_rows if not is_read))
+                _archive(db, user_id, user_rows, now)
+                data_version.bump(db, user_id)
+            db.commit()
+
+        unread = sum(1 for row in rows if not row.is_read)
+        metrics["rows_purged"] += len(rows)
+        metrics["unread_purged"] += unread
+        metrics["read_purged"] += len(rows) - unread
+        metrics["batches"] += 1
+        users.update(by_user)
+        last = (candidates[-1].created_at, candidates[-1].id)
+        if len(candidates) < batch_size:
+            break
+
+    metrics["users_affected"] = len(users)
+    metrics["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    with _stats_lock:
+        _totals["runs"] += 1
+        for key in ("rows_purged", "read_purged", "unread_purged"):
+            _totals[key] += metrics[key]
+        _totals["last_run"] = dict(metrics, finished_at=datetime.utcnow().isoformat())
+    if metrics["rows_purged"]:
+        print(
+            f"🧹 Retención de notificaciones: {metrics['rows_purged']} purgadas "
+            f"({metrics['read_purged']} leídas, {metrics['unread_purged']} no leídas) "
+            f"en {metrics['batches']} lotes, {metrics['duration_ms']} ms"
+        )
+    return metrics
+
+def stats() -> dict:
+    """Totales acumulados desde el arranque del proceso y métricas de la última corrida"""
+    with _stats_lock:
+        return {
+            "read_days": RETENTION_READ_DAYS,
+            "unread_days": RETENTION_UNREAD_DAYS,
+            "batch_size": PURGE_BATCH_SIZE,
+            **{key: (dict(value) if isinstance(value, dict) else value) for key, value in _totals.items()},
+        }
+
+purge_job = PeriodicJob(
+    "notification-retention",
+    purge,
+    float(os.getenv("NOTIFICATION_PURGE_INTERVAL_SECONDS", 3600)),
+    exclusive=True,
+)
+
+if __name__ == "__main__":
+    # Purga manual: python -m app.core.notification_retention
+    print(purge())
@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import date, datetime, time
+from typing import List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import and_, false, or_
+
+# (columna, descendente)
+SortKey = Sequence[Tuple[object, bool]]
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, time):
+        return {"t": value.isoformat()}
+    return value
+
+# Tipos que el cursor puede traer tal cual; fechas y horas van como {"dt"|"d"|"t": iso}
+CURSOR_SCALARS = (str, int, float, bool, type(None))
+CURSOR_DATE_TYPES = {"dt": datetime, "d": date, "t": time}
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if len(value) != 1:
+            raise ValueError("valor de cursor inválido")
+        (tag, iso), = value.items()
+        if tag not in CURSOR_DATE_TYPES or not isinstance(iso, str):
+            raise ValueError("valor de cursor inválido")
+        return CURSOR_DATE_TYPES[tag].fromisoformat(iso)
+    if not isinstance(value, CURSOR_SCALARS):
+        raise ValueError("valor de cursor inválido")
+    return value
+
+def encode_cursor(sort: str, values: Sequence) -> str:
+    """Cursor opaco: orden solicitado + valores de la última fila devuelta"""
+    payload = json.dumps({"s": sort, "v": [_dump_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, sort_key: SortKey) -> List:
+    """Valores del cursor: uno por columna de sort_key, escalares o fechas ISO"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        raw_values = payload["v"]
+        if not isinstance(raw_values, list) or len(raw_values) != len(sort_key):
+            raise ValueError("cantidad de valores incorrecta")
+        values = [_load_value(v) for v in raw_values]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if payload.get("s") != sort:
+        raise HTTPException(status_code=400, detail="El cursor no corresponde al orden solicitado")
+    return values
+
+def keyset_filter(sort_key: SortKey, values: Sequence):
+    """
+    Predicado "después de (v1, ..., vn)" para ORDER BY sort_key.
+    Expande la comparación lexicográfica:
+        OR_i ( c1 = v1 AND ... AND c(i-1) = v(i-1) AND ci después de vi )
+    Respeta el orden de NULL de MySQL/SQLite: primero en ASC, último en DESC.
+    """
+    clauses = []
+    equal_so_far = []
+    for (column, descending), value in zip(sort_key, values):
+        if value is None:
+            after = false() if descending else column.isnot(None)
+            equal = column.is_(None)
+        elif isinstance(value, bool):
+            # SQLAlchemy no permite < / > con True/False
+            if descending:
+                after = or_(column.is_(False), column.is_(None)) if value else column.is_(None)
+            else:
+                after = false() if value else column.is_(True)
+            equal = column.is_(value)
+        else:
+            after = or_(column < value, column.is_(None)) if descending else column > value
+            equal = column == value
+        clauses.append(and_(*equal_so_far, after))
+        equal_so_far.append(equal)
+    return or_(*clauses)
+
+def order_by_clauses(sort_key: SortKey):
+    return [column.desc() if descending else column.asc() for column, descending in sort_key]
+
+def row_values(row, sort_key: SortKey) -> List:
+    return [getattr(row, column.key) for column, _ in sort_key]
+
+def next_cursor_for(rows: list, sort: str, sort_key: SortKey) -> Optional[str]:
+    if not rows:
+        return None
+    return encode_cursor(sort, row_values(rows[-1], sort_key))
@@ -0,0 +1,123 @@
+import os
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Iterable, List
+from dotenv import load_dotenv
+from app.core.priority_queue import priority_sort_key
+
+load_dotenv()
+
+class UserPriorityIndex:
+    """
+    Tareas pendientes de un usuario ordenadas por priority_sort_key.
+    Lista ordenada + bisect: búsqueda O(log n) y lectura del top-k O(k).
+    """
+
+    def __init__(self, tasks=()):
+        self.keys = sorted(priority_sort_key(task) for task in tasks)
+        self.scores = {key[-1]: key for key in self.keys}
+
+    def remove(self, task_id: int):
+        key = self.scores.pop(task_id, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+    def upsert(self, task):
+        """Inserta o reubica la tarea; las completadas salen del índice"""
+        self.remove(task.id)
+        if task.is_completed:
+            return
+        key = priority_sort_key(task)
+        insort(self.keys, key)
+        self.scores[task.id] = key
+
+    def top_ids(self, limit: int) -> List[int]:
+        return [key[-1] for key in self.keys[:limit]]
+
+    def __len__(self):
+        return len(self.keys)
+
+class PriorityIndexCache:
+    """
+    Caché LRU por usuario de UserPriorityIndex, mantenida de forma incremental
+    desde las escrituras de routes/tasks.py. Si no está el usuario se
+    reconstruye desde la DB.
+
+    Cada índice guarda el users.data_version con el que se construyó (igual que
+    la caché de /tasks/stats): si la versión de la DB no coincide, otro worker
+    (o una escritura concurrente) cambió las tareas y el índice se reconstruye.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self.entries = OrderedDict()  # user_id -> (data_version, UserPriorityIndex)
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, user_id: int, version: int, index: UserPriorityIndex):
+        entry = self.entries.get(user_id)
+        if entry is not None and entry[0] > version:
+            return
+        self.entries[user_id] = (version, index)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_users:
+            self.entries.popitem(last=False)
+
+    def top_ids(self, user_id: int, version: int, limit: int, loader: Callable[[], list]) -> List[int]:
+        """
+        IDs de las `limit` tareas pendientes más prioritarias del usuario.
+        `version` es el data_version actual del usuario y `loader` devuelve las
+        tareas pendientes (con las columnas de priority_sort_key); solo se llama
+        si el índice no está en caché o quedó desactualizado.
+        """
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1].top_ids(limit)
+            self.misses += 1
+
+        index = UserPriorityIndex(loader())
+
+        with self.lock:
+            self._store(user_id, version, index)
+        return index.top_ids(limit)
+
+    def record_write(self, user_id: int, version: int, saved: Iterable = (), deleted: Iterable[int] = ()):
+        """
+        Llamar después del commit de una escritura que llevó el data_version del
+        usuario a `version` (ver data_version.bump). Solo se aplica sobre el
+        índice de la versión anterior; si faltan escrituras intermedias se descarta.
+        """
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] >= version:
+                return
+            if entry[0] != version - 1:
+                del self.entries[user_id]
+                return
+            index = entry[1]
+            for task in saved:
+                index.upsert(task)
+            for task_id in deleted:
+                index.remove(task_id)
+            self._store(user_id, version, index)
+
+    def invalidate(self, user_id: int):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "users": len(self.entries),
+                "max_users": self.max_users,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+priority_index_max_users = int(os.getenv("PRIORITY_INDEX_MAX_USERS", 1000))
+priority_index = PriorityIndexCache(max_users=priority_index_max_users)
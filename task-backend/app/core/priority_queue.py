@@ -1,6 +1,58 @@
 import heapq
 from datetime import datetime
 from typing import List, Tuple, Optional
+from app.models import models
+
+PRIORITY_MAP = {
+    'urgent': 0,
+    'high': 1,
+    'medium': 2,
+    'low': 3
+}
+
+def priority_sort_columns(priority, due_date, due_time) -> Tuple[int, datetime]:
+    """Valores de (priority_rank, due_sort_key) para una tarea"""
+    priority = getattr(priority, "value", priority)
+    if due_date:
+        due_sort_key = datetime.combine(due_date, due_time or datetime.min.time())
+    else:
+        due_sort_key = models.NO_DUE_DATE_SORT_KEY
+    return PRIORITY_MAP.get(priority, 2), due_sort_key
+
+def set_priority_sort_columns(task):
+    """
+    Actualiza las columnas persistidas del score de prioridad
+    (priority_rank, due_sort_key). Llamar al crear o editar una tarea.
+    """
+    task.priority_rank, task.due_sort_key = priority_sort_columns(task.priority, task.due_date, task.due_time)
+
+# (columna, descendente) equivalente a TaskPriorityQueue._get_priority_score:
+# (prioridad, vencimiento, importantes primero, no completadas primero, id)
+PRIORITY_SORT_KEY = (
+    (models.Task.priority_rank, False),
+    (models.Task.due_sort_key, False),
+    (models.Task.important, True),
+    (models.Task.is_completed, False),
+    (models.Task.id, False),
+)
+
+def priority_order_by():
+    """ORDER BY de PRIORITY_SORT_KEY"""
+    return tuple(column.desc() if descending else column.asc() for column, descending in PRIORITY_SORT_KEY)
+
+def priority_sort_key(task) -> Tuple:
+    """
+    Clave de orden en Python idéntica a priority_order_by() (usa las mismas
+    columnas persistidas), para estructuras en memoria que deben coincidir
+    exactamente con el orden de la DB.
+    """
+    return (
+        task.priority_rank,
+        task.due_sort_key,
+        0 if task.important else 1,
+        1 if task.is_completed else 0,
+        task.id,
+    )
 
 class TaskPriorityQueue:
     """
@@ -13,12 +65,7 @@ class TaskPriorityQueue:
     
     def __init__(self):
         self.heap = []
-        self.priority_map = {
-            'urgent': 0,
-            'high': 1, 
-            'medium': 2,
-            'low': 3
-        }
+        self.priority_map = PRIORITY_MAP
     
     def _get_priority_score(self, task) -> Tuple[int, float, int, int]:
         """Calcula el score de prioridad"""
@@ -54,21 +101,31 @@ class TaskPriorityQueue:
         return None
     
     def push_all(self, tasks: List):
-        """Agrega múltiples tareas a la cola"""
-        for task in tasks:
-            self.push(task)
+        """Agrega múltiples tareas a la cola (heapify en bloque, O(n))"""
+        score = self._get_priority_score
+        self.heap.extend((score(task), task) for task in tasks)
+        heapq.heapify(self.heap)
     
     def get_priority_list(self, limit: Optional[int] = None) -> List:
-        """Obtiene lista de tareas ordenadas por prioridad (de mayor a menor)"""
+        """
+        Obtiene lista de tareas ordenadas por prioridad (de mayor a menor).
+        Con `limit` recorre el heap con una frontera de índices: O(k log k),
+        sin copiar ni modificar el heap.
+        """
+        heap = self.heap
+        if limit is None or limit >= len(heap):
+            return [task for priority_score, task in sorted(heap)]
+
         sorted_tasks = []
-        temp_heap = self.heap.copy()
-        
-        while temp_heap and (limit is None or len(sorted_tasks) < limit):
-            priority_score, task = heapq.heappop(temp_heap)
+        frontier = [(heap[0], 0)] if heap and limit > 0 else []
+        while frontier and len(sorted_tasks) < limit:
+            (priority_score, task), index = heapq.heappop(frontier)
             sorted_tasks.append(task)
-        
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
         return sorted_tasks
-    
+
     def __len__(self):
         return len(self.heap)
     
@@ -0,0 +1,83 @@
+import hashlib
+import json
+from typing import Dict, Optional
+from jose import jwt, JWTError
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI puro que aplica el rate limit de la API autenticada antes
+    de resolver dependencias: no se decodifica/verifica el JWT ni se consulta
+    la DB para un cliente que ya está limitado.
+
+    La clave es `<sub sin verificar>:<ip>` (igual que antes, porque sub == user.id).
+    Si el token no trae un sub legible se usa un digest del token. Falsificar el
+    sub no permite consumir la cuota de otro cliente porque la IP forma parte de
+    la clave, y el token se sigue verificando después en get_current_user.
+
+    `route_limits` mapea prefijos de ruta a un limitador (o None para excluirlos);
+    gana el prefijo más largo y si ninguno coincide se usa `default_limiter`.
+    Solo se limitan solicitudes con `Authorization: Bearer`.
+    """
+
+    def __init__(self, app, default_limiter, route_limits: Optional[Dict[str, object]] = None):
+        self.app = app
+        self.default_limiter = default_limiter
+        self.route_limits = sorted((route_limits or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limiter_for(self, path: str):
+        for prefix, limiter in self.route_limits:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return limiter
+        return self.default_limiter
+
+    def _bearer_token(self, scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    return token.strip()
+                return None
+        return None
+
+    def _client_key(self, token: str, scope) -> str:
+        try:
+            subject = jwt.get_unverified_claims(token).get("sub")
+        except JWTError:
+            subject = None
+        if subject is None:
+            subject = "t-" + hashlib.sha256(token.encode()).hexdigest()[:32]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        return f"{subject}:{client_ip}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._limiter_for(scope["path"])
+        token = self._bearer_token(scope) if limiter is not None else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed, block_time = limiter.check_and_record(self._client_key(token, scope))
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = int(block_time)
+        body = json.dumps(
+            {"detail": f"Límite de solicitudes excedido. Espere {retry_after} segundos."},
+            ensure_ascii=False
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,91 +1,435 @@
 import time
 import os
-import heapq  # NUEVO IMPORT
-from collections import defaultdict
-from threading import Lock
+import fcntl
+import hashlib
+import mmap
+import sqlite3
+import struct
+import tempfile
+from threading import Event, Lock, Thread, local
+from typing import Tuple
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class RateLimiter:
+class SweeperMixin:
+    """Barrido periódico de claves inactivas en un hilo daemon"""
+
+    _sweeper = None
+    _sweeper_stop = None
+
+    def start_sweeper(self, interval_seconds: float = None):
+        """Inicia un hilo daemon que llama a sweep() periódicamente"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        interval = interval_seconds or self.window_seconds
+        self._sweeper_stop = Event()
+
+        def run():
+            while not self._sweeper_stop.wait(interval):
+                self.sweep()
+
+        self._sweeper = Thread(target=run, name="rate-limiter-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        if self._sweeper_stop is not None:
+            self._sweeper_stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1)
+            self._sweeper = None
+
+# Marca para _transact: dejar la entrada sin cambios
+KEEP = object()
+
+class SlidingWindowLimiter(SweeperMixin):
+    """
+    Rate limiter de ventana deslizante aproximada (sliding window counter).
+    Por clave solo guarda (índice de ventana, conteo anterior, conteo actual),
+    así la memoria es O(1) por clave sin importar max_requests.
+    La estimación pondera la ventana anterior por la fracción que aún se solapa:
+        estimado = anterior * (W - transcurrido) / W + actual
+
+    Las subclases definen dónde vive el estado implementando _transact().
+    """
+
     def __init__(self, max_requests: int, window_seconds: int):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
-        self.lock = Lock()
+
+    def _transact(self, key: str, fn):
+        """
+        Ejecuta fn(entry) de forma atómica para `key`.
+        fn recibe la entrada guardada (o None) y devuelve (nueva_entrada, resultado);
+        nueva_entrada es KEEP para no escribir o None para borrar la clave.
+        """
+        raise NotImplementedError
+
+    def _shift(self, entry, now: float):
+        """Devuelve (window_index, anterior, actual, transcurrido) ya desplazados a `now`"""
+        window_index = int(now // self.window_seconds)
+        elapsed = now - window_index * self.window_seconds
+        if entry is None:
+            return window_index, 0, 0, elapsed
+
+        stored_index, previous, current = entry
+        if stored_index == window_index:
+            return window_index, previous, current, elapsed
+        if stored_index == window_index - 1:
+            return window_index, current, 0, elapsed
+        return window_index, 0, 0, elapsed
+
+    def _estimate(self, previous: int, current: int, elapsed: float) -> float:
+        return previous * (self.window_seconds - elapsed) / self.window_seconds + current
+
+    def _block_time(self, previous: int, current: int, elapsed: float) -> float:
+        """Segundos hasta que el estimado baje de max_requests"""
+        window = self.window_seconds
+        if self._estimate(previous, current, elapsed) < self.max_requests:
+            return 0
+        left_in_window = window - elapsed
+
+        if current < self.max_requests:
+            # Basta con que la ventana anterior deje de solaparse lo suficiente
+            needed = left_in_window - (self.max_requests - current) * window / previous
+            return max(0, needed)
+
+        # La ventana actual ya está llena: esperar a que pase a ser la anterior
+        return left_in_window + window * (1 - self.max_requests / current)
+
+    def _is_stale(self, entry, now: float) -> bool:
+        """La entrada no tiene solicitudes en las dos últimas ventanas"""
+        return entry[0] < int(now // self.window_seconds) - 1
 
     def is_blocked(self, key: str) -> bool:
-        with self.lock:
-            now = time.time()
-            
-            # NUEVO: Usar heapq para mantener las solicitudes ordenadas
-            if key in self.requests:
-                # Limpiar solicitudes antiguas usando búsqueda binaria
-                requests = self.requests[key]
-                
-                # Encontrar el índice donde las solicitudes son recientes
-                cutoff_time = now - self.window_seconds
-                
-                # Usar heapq para mantener el heap y eliminar elementos antiguos eficientemente
-                while requests and requests[0] < cutoff_time:
-                    heapq.heappop(requests)
-                
-                self.requests[key] = requests
-                
-                return len(requests) >= self.max_requests
-            return False
+        def fn(entry):
+            _, previous, current, elapsed = self._shift(entry, time.time())
+            return KEEP, self._estimate(previous, current, elapsed) >= self.max_requests
+        return self._transact(key, fn)
 
     def get_remaining_requests(self, key: str) -> int:
-        with self.lock:
-            now = time.time()
-            if key in self.requests:
-                requests = self.requests[key]
-                cutoff_time = now - self.window_seconds
-                
-                # Filtrar solicitudes recientes usando heapq
-                recent_requests = [req for req in requests if req >= cutoff_time]
-                heapq.heapify(recent_requests)
-                self.requests[key] = recent_requests
-                
-                return max(0, self.max_requests - len(recent_requests))
-            return self.max_requests
+        def fn(entry):
+            _, previous, current, elapsed = self._shift(entry, time.time())
+            return KEEP, max(0, self.max_requests - int(self._estimate(previous, current, elapsed)))
+        return self._transact(key, fn)
 
     def record_request(self, key: str):
-        with self.lock:
-            now = time.time()
-            if key not in self.requests:
-                self.requests[key] = []
-            
-            # Usar heapq para insertar eficientemente
-            heapq.heappush(self.requests[key], now)
-            
-            # Limpiar solicitudes antiguas
-            cutoff_time = now - self.window_seconds
-            requests = self.requests[key]
-            
-            while requests and requests[0] < cutoff_time:
-                heapq.heappop(requests)
+        def fn(entry):
+            window_index, previous, current, _ = self._shift(entry, time.time())
+            return (window_index, previous, current + 1), None
+        self._transact(key, fn)
+
+    def check_and_record(self, key: str) -> Tuple[bool, float]:
+        """
+        Verifica y registra en una sola sección crítica.
+        Devuelve (permitido, segundos_de_bloqueo); si está bloqueado no registra.
+        """
+        def fn(entry):
+            window_index, previous, current, elapsed = self._shift(entry, time.time())
+            if self._estimate(previous, current, elapsed) >= self.max_requests:
+                return KEEP, (False, self._block_time(previous, current, elapsed))
+            return (window_index, previous, current + 1), (True, 0)
+        return self._transact(key, fn)
 
     def get_block_time_remaining(self, key: str) -> float:
-        with self.lock:
-            if key not in self.requests or not self.requests[key]:
-                return 0
-                
-            now = time.time()
-            # El elemento más antiguo está en la raíz del heap
-            oldest_request = self.requests[key][0]
-            return max(0, self.window_seconds - (now - oldest_request))
+        def fn(entry):
+            _, previous, current, elapsed = self._shift(entry, time.time())
+            return KEEP, self._block_time(previous, current, elapsed)
+        return self._transact(key, fn)
 
     def clear_requests(self, key: str):
+        self._transact(key, lambda entry: (None, None))
+
+class RateLimiter(SlidingWindowLimiter):
+    """Estado en un dict del proceso protegido por un único lock"""
+
+    def __init__(self, max_requests: int, window_seconds: int):
+        super().__init__(max_requests, window_seconds)
+        self.requests = {}  # key -> (window_index, previous_count, current_count)
+        self.lock = Lock()
+
+    def _transact(self, key: str, fn):
+        with self.lock:
+            new_entry, result = fn(self.requests.get(key))
+            if new_entry is None:
+                self.requests.pop(key, None)
+            elif new_entry is not KEEP:
+                self.requests[key] = new_entry
+            return result
+
+    def sweep(self, batch_size: int = 1000) -> int:
+        """Elimina claves inactivas (sin solicitudes en las dos últimas ventanas)"""
         with self.lock:
-            if key in self.requests:
-                del self.requests[key]
+            keys = list(self.requests.keys())
+
+        removed = 0
+        for i in range(0, len(keys), batch_size):
+            # Tomar el lock por lotes para no frenar a los requests concurrentes
+            with self.lock:
+                now = time.time()
+                for key in keys[i:i + batch_size]:
+                    entry = self.requests.get(key)
+                    if entry is not None and self._is_stale(entry, now):
+                        del self.requests[key]
+                        removed += 1
+        return removed
+
+    def __len__(self):
+        return len(self.requests)
+
+class ShardedRateLimiter(SweeperMixin):
+    """
+    RateLimiter con lock striping: cada clave se asigna por hash a uno de
+    `stripes` limitadores independientes, cada uno con su propio lock.
+    Expone la misma API que RateLimiter.
+    """
+
+    def __init__(self, max_requests: int, window_seconds: int, stripes: int = 16):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.shards = [RateLimiter(max_requests, window_seconds) for _ in range(max(1, stripes))]
+
+    def _shard(self, key: str) -> RateLimiter:
+        return self.shards[hash(key) % len(self.shards)]
+
+    def is_blocked(self, key: str) -> bool:
+        return self._shard(key).is_blocked(key)
+
+    def get_remaining_requests(self, key: str) -> int:
+        return self._shard(key).get_remaining_requests(key)
+
+    def record_request(self, key: str):
+        self._shard(key).record_request(key)
+
+    def check_and_record(self, key: str) -> Tuple[bool, float]:
+        return self._shard(key).check_and_record(key)
+
+    def get_block_time_remaining(self, key: str) -> float:
+        return self._shard(key).get_block_time_remaining(key)
+
+    def clear_requests(self, key: str):
+        self._shard(key).clear_requests(key)
+
+    def sweep(self, batch_size: int = 1000) -> int:
+        return sum(shard.sweep(batch_size) for shard in self.shards)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+class MmapRateLimiter(SlidingWindowLimiter):
+    """
+    Estado compartido entre los workers de un mismo host mediante un archivo
+    mapeado en memoria (por defecto en /dev/shm).
+
+    El archivo es una tabla hash de tamaño fijo dividida en stripes; cada slot
+    guarda (hash de la clave, window_index, anterior, actual). Cada stripe se
+    protege con un lock de hilo + un lock de rango de bytes (fcntl) entre procesos.
+    Los slots inactivos se reutilizan; si un stripe se llena se desaloja el
+    slot con la ventana más antigua, así que la memoria nunca crece.
+    """
+
+    SLOT = struct.Struct("<QqII")
+    PROBE = 16
+
+    def __init__(self, max_requests: int, window_seconds: int, path: str,
+                 slots: int = 65536, stripes: int = 64):
+        super().__init__(max_requests, window_seconds)
+        self.stripes = max(1, stripes)
+        self.slots_per_stripe = max(self.PROBE, slots // self.stripes)
+        self.path = path
+        size = self.SLOT.size * self.slots_per_stripe * self.stripes
+
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        self.thread_locks = [Lock() for _ in range(self.stripes)]
+
+    def _key_hash(self, key: str) -> int:
+        # hash() de Python cambia entre procesos; blake2b es estable
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        return digest or 1
+
+    def _read(self, slot: int):
+        return self.SLOT.unpack_from(self.map, slot * self.SLOT.size)
+
+    def _write(self, slot: int, key_hash: int, entry):
+        self.SLOT.pack_into(self.map, slot * self.SLOT.size, key_hash, *entry)
+
+    def _lock_stripe(self, stripe: int):
+        self.thread_locks[stripe].acquire()
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, stripe)
+
+    def _unlock_stripe(self, stripe: int):
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, stripe)
+        self.thread_locks[stripe].release()
+
+    def _find_slot(self, stripe: int, key_hash: int, now: float):
+        """Devuelve (slot, encontrado) dentro de la secuencia de sondeo del stripe"""
+        base = stripe * self.slots_per_stripe
+        start = key_hash % self.slots_per_stripe
+        free_slot = None
+        oldest_slot, oldest_index = None, None
+
+        for i in range(self.PROBE):
+            slot = base + (start + i) % self.slots_per_stripe
+            slot_hash, window_index, previous, current = self._read(slot)
+            if slot_hash == key_hash:
+                return slot, True
+            if free_slot is None and (slot_hash == 0 or self._is_stale((window_index, previous, current), now)):
+                free_slot = slot
+            if oldest_index is None or window_index < oldest_index:
+                oldest_slot, oldest_index = slot, window_index
+
+        return (free_slot if free_slot is not None else oldest_slot), False
+
+    def _transact(self, key: str, fn):
+        key_hash = self._key_hash(key)
+        stripe = (key_hash >> 32) % self.stripes
+        self._lock_stripe(stripe)
+        try:
+            slot, found = self._find_slot(stripe, key_hash, time.time())
+            entry = self._read(slot)[1:] if found else None
+            new_entry, result = fn(entry)
+            if new_entry is None:
+                if found:
+                    self._write(slot, 0, (0, 0, 0))
+            elif new_entry is not KEEP:
+                self._write(slot, key_hash, new_entry)
+            return result
+        finally:
+            self._unlock_stripe(stripe)
+
+    def sweep(self, batch_size: int = 1000) -> int:
+        """Libera slots inactivos (opcional: los slots inactivos ya se reutilizan)"""
+        removed = 0
+        for stripe in range(self.stripes):
+            self._lock_stripe(stripe)
+            try:
+                now = time.time()
+                base = stripe * self.slots_per_stripe
+                for slot in range(base, base + self.slots_per_stripe):
+                    slot_hash, *entry = self._read(slot)
+                    if slot_hash and self._is_stale(entry, now):
+                        self._write(slot, 0, (0, 0, 0))
+                        removed += 1
+            finally:
+                self._unlock_stripe(stripe)
+        return removed
+
+    def __len__(self):
+        return sum(1 for slot in range(self.stripes * self.slots_per_stripe) if self._read(slot)[0])
+
+class SQLiteRateLimiter(SlidingWindowLimiter):
+    """
+    Estado compartido en una base SQLite (modo WAL). Sirve para varios workers
+    del mismo host sin servicios extra; cada operación es una transacción
+    BEGIN IMMEDIATE, que serializa las escrituras entre procesos.
+    """
+
+    def __init__(self, max_requests: int, window_seconds: int, path: str, name: str):
+        super().__init__(max_requests, window_seconds)
+        self.path = path
+        self.name = name
+        self.local = local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " limiter TEXT NOT NULL, key TEXT NOT NULL,"
+                " window_index INTEGER NOT NULL, previous INTEGER NOT NULL, current INTEGER NOT NULL,"
+                " PRIMARY KEY (limiter, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def _transact(self, key: str, fn):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_index, previous, current FROM rate_limits WHERE limiter = ? AND key = ?",
+                (self.name, key)
+            ).fetchone()
+            new_entry, result = fn(tuple(row) if row else None)
+            if new_entry is None:
+                conn.execute("DELETE FROM rate_limits WHERE limiter = ? AND key = ?", (self.name, key))
+            elif new_entry is not KEEP:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (limiter, key, window_index, previous, current)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self.name, key, *new_entry)
+                )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def sweep(self, batch_size: int = 1000) -> int:
+        """Elimina claves inactivas en lotes pequeños para no bloquear a los workers"""
+        conn = self._connection()
+        cutoff = int(time.time() // self.window_seconds) - 1
+        removed = 0
+        while True:
+            cursor = conn.execute(
+                "DELETE FROM rate_limits WHERE rowid IN ("
+                " SELECT rowid FROM rate_limits WHERE limiter = ? AND window_index < ? LIMIT ?)",
+                (self.name, cutoff, batch_size)
+            )
+            removed += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return removed
+
+    def __len__(self):
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM rate_limits WHERE limiter = ?", (self.name,)
+        ).fetchone()
+        return row[0]
+
+# Backend del estado: memory (por proceso, por defecto), mmap (compartido entre
+# workers del host) o sqlite (compartido vía archivo)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_SHM_DIR = os.getenv("RATE_LIMIT_SHM_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+RATE_LIMIT_SHM_SLOTS = int(os.getenv("RATE_LIMIT_SHM_SLOTS", 65536))
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "task-api-rate-limits.db"))
+
+# Número de stripes (locks independientes) por limitador
+rate_limit_stripes = int(os.getenv("RATE_LIMIT_STRIPES", 16))
+
+def create_rate_limiter(name: str, max_requests: int, window_seconds: int):
+    """Crea el limitador según RATE_LIMIT_BACKEND"""
+    if RATE_LIMIT_BACKEND == "memory":
+        return ShardedRateLimiter(max_requests, window_seconds, stripes=rate_limit_stripes)
+    if RATE_LIMIT_BACKEND == "mmap":
+        path = os.path.join(RATE_LIMIT_SHM_DIR, f"task-api-rate-limit-{name}")
+        return MmapRateLimiter(max_requests, window_seconds, path, slots=RATE_LIMIT_SHM_SLOTS)
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteRateLimiter(max_requests, window_seconds, RATE_LIMIT_SQLITE_PATH, name)
+    raise ValueError(f"RATE_LIMIT_BACKEND no soportado: {RATE_LIMIT_BACKEND}")
 
 # Rate limiter para login (5 req/min por IP)
 login_max_requests = int(os.getenv("RATE_LIMIT_AUTH_PER_MIN", 5))
-login_rate_limiter = RateLimiter(max_requests=login_max_requests, window_seconds=60)
+login_rate_limiter = create_rate_limiter("login", max_requests=login_max_requests, window_seconds=60)
 
 # Rate limiter para API autenticada (60 req/min por token/IP)
 api_max_requests = int(os.getenv("RATE_LIMIT_API_PER_MIN", 60))
-api_rate_limiter = RateLimiter(max_requests=api_max_requests, window_seconds=60)
\ No newline at end of file
+api_rate_limiter = create_rate_limiter("api", max_requests=api_max_requests, window_seconds=60)
+
+# Frecuencia del barrido de claves inactivas
+sweep_interval_seconds = float(os.getenv("RATE_LIMIT_SWEEP_INTERVAL_SECONDS", 60))
+
+def start_sweepers():
+    login_rate_limiter.start_sweeper(sweep_interval_seconds)
+    api_rate_limiter.start_sweeper(sweep_interval_seconds)
+
+def stop_sweepers():
+    login_rate_limiter.stop_sweeper()
+    api_rate_limiter.stop_sweeper()
\ No newline at end of file
@@ -0,0 +1,116 @@
+import re
+from typing import List
+from sqlalchemy import false, literal_column, or_, table, column, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Query, Session
+from app.models import models
+
+# Índice de texto completo sobre tasks(title, description):
+#   - MySQL: índice FULLTEXT (InnoDB lo mantiene solo al insertar/editar/borrar)
+#   - SQLite: tabla FTS5 con contenido externo sincronizada por triggers
+# Ambos se crean en migrations/versions/0004_task_search_index.py.
+# Cualquier otro motor usa el LIKE '%q%' anterior.
+
+MYSQL_FULLTEXT_INDEX = "ft_tasks_title_description"
+# innodb_ft_min_token_size por defecto: tokens más cortos no se indexan
+MYSQL_MIN_TOKEN_LENGTH = 3
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    " title, description, content='tasks', content_rowid='id',"
+    " tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN"
+    " INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN"
+    " INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN"
+    " INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+    " INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);"
+    " END",
+]
+
+tasks_fts = table("tasks_fts", column("rowid"))
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(q: str) -> List[str]:
+    return [token.lower() for token in TOKEN_RE.findall(q or "")]
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def _mysql_terms(tokens: List[str]) -> str:
+    # Todos los términos obligatorios, con prefijo para typeahead: +tok*
+    return " ".join(f"+{token}*" for token in tokens)
+
+def _fts5_terms(tokens: List[str]) -> str:
+    # AND implícito entre términos; "tok"* = prefijo
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _like_filter(query: Query, q: str) -> Query:
+    qn = f"%{q.lower()}%"
+    return query.filter(
+        or_(
+            models.Task.title.ilike(qn),
+            models.Task.description.ilike(qn)
+        )
+    )
+
+def _like_tokens_filter(query: Query, tokens: List[str]) -> Query:
+    # Cada token obligatorio, como subcadena
+    for token in tokens:
+        query = _like_filter(query, token)
+    return query
+
+def supports_relevance(db: Session) -> bool:
+    return _dialect(db) in ("mysql", "sqlite")
+
+def apply_search(query: Query, db: Session, q: str, order_by_relevance: bool = False) -> Query:
+    """
+    Filtra `query` (sobre models.Task) por el texto `q`: tokens con coincidencia
+    por prefijo, todos obligatorios. Con order_by_relevance ordena por ranking
+    (más relevante primero, id de desempate).
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        # Solo puntuación/espacios: no coincide con ninguna tarea
+        return query.filter(false())
+    dialect = _dialect(db)
+
+    if dialect == "mysql":
+        # FULLTEXT no indexa tokens cortos: esos se exigen con LIKE
+        short_tokens = [token for token in tokens if len(token) < MYSQL_MIN_TOKEN_LENGTH]
+        long_tokens = [token for token in tokens if len(token) >= MYSQL_MIN_TOKEN_LENGTH]
+        query = _like_tokens_filter(query, short_tokens)
+        if not long_tokens:
+            if order_by_relevance:
+                query = query.order_by(models.Task.id.desc())
+            return query
+        score = match(models.Task.title, models.Task.description, against=_mysql_terms(long_tokens)).in_boolean_mode()
+        query = query.filter(score)
+        if order_by_relevance:
+            query = query.order_by(score.desc(), models.Task.id.desc())
+        return query
+
+    if dialect == "sqlite":
+        query = query.join(tasks_fts, tasks_fts.c.rowid == models.Task.id).filter(
+            text("tasks_fts MATCH :fts_terms").bindparams(fts_terms=_fts5_terms(tokens))
+        )
+        if order_by_relevance:
+            # bm25: menor = más relevante
+            query = query.order_by(literal_column("bm25(tasks_fts)"), models.Task.id.desc())
+        return query
+
+    query = _like_filter(query, q)
+    if order_by_relevance:
+        query = query.order_by(models.Task.id.desc())
+    return query
+
+def ensure_sqlite_search_schema(connection):
+    """Crea la tabla FTS5 y sus triggers (desarrollo con AUTO_CREATE_TABLES)"""
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in SQLITE_FTS_DDL:
+        connection.exec_driver_sql(statement)
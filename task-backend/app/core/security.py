@@ -1,8 +1,16 @@
 # app/core/security.py
+import multiprocessing
 import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
+from threading import BoundedSemaphore, Lock
 from typing import Optional
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
 from jose import jwt
 from dotenv import load_dotenv
 
@@ -15,12 +23,123 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
 # Usamos pbkdf2_sha256 para evitar dependencias binarias y la limitación de 72 bytes de bcrypt.
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+# Pool de procesos dedicado al hashing (0 = ejecutar en el hilo del request)
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+# Máximo de operaciones en curso + en cola antes de rechazar con 503
+HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", HASH_WORKERS * 4 or 1))
+HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 2))
+# Latencia objetivo de un hash (ms); 0 desactiva la calibración al arrancar
+HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", 0))
+HASH_MIN_ROUNDS = int(os.getenv("PASSWORD_HASH_MIN_ROUNDS", pbkdf2_sha256.default_rounds))
+# Arranque de los procesos del pool: forkserver/spawn no heredan los hilos
+# (sweepers, jobs, threadpool) ni sus locks tomados, a diferencia de fork
+HASH_MP_CONTEXT = os.getenv("PASSWORD_HASH_MP_CONTEXT", "forkserver")
+# Mediciones para la calibración (se usa la mediana)
+HASH_CALIBRATION_SAMPLES = int(os.getenv("PASSWORD_HASH_CALIBRATION_SAMPLES", 5))
+
+hash_rounds = int(os.getenv("PASSWORD_HASH_ROUNDS", pbkdf2_sha256.default_rounds))
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_executor_lock = Lock()
+_hash_slots = BoundedSemaphore(HASH_MAX_PENDING)
+
+def _hash_in_worker(password: str, rounds: int) -> str:
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+def _verify_in_worker(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _mp_context():
+    if HASH_MP_CONTEXT in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context(HASH_MP_CONTEXT)
+    # forkserver no existe en Windows
+    return multiprocessing.get_context("spawn")
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=_mp_context())
+        return _hash_executor
+
+def start_hash_executor():
+    """Crea el pool y levanta sus procesos al arrancar, antes de atender requests"""
+    if HASH_WORKERS <= 0:
+        return
+    executor = _get_hash_executor()
+    for future in [executor.submit(int) for _ in range(HASH_WORKERS)]:
+        future.result()
+
+def _discard_broken_executor(broken: ProcessPoolExecutor):
+    """Descarta el pool roto; el próximo _get_hash_executor() crea uno nuevo"""
+    global _hash_executor
+    with _hash_executor_lock:
+        # Otro hilo pudo haberlo reemplazado ya
+        if _hash_executor is broken:
+            _hash_executor = None
+    broken.shutdown(wait=False)
+
+def _run_hashing(fn, *args):
+    """Ejecuta `fn` en el pool de hashing; rechaza rápido si está saturado"""
+    if HASH_WORKERS <= 0:
+        return fn(*args)
+
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado procesando credenciales. Intente nuevamente.",
+            headers={"Retry-After": str(HASH_RETRY_AFTER)}
+        )
+    try:
+        executor = _get_hash_executor()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # Un worker murió (p. ej. OOM): se recrea el pool y se reintenta una vez
+            print("⚠️ Pool de hashing roto, recreándolo")
+            _discard_broken_executor(executor)
+            return _get_hash_executor().submit(fn, *args).result()
+    finally:
+        _hash_slots.release()
+
 def hash_password(password: str) -> str:
     # password debe ser str (no None). Validar antes si lo deseas.
-    return pwd_context.hash(password)
+    return _run_hashing(_hash_in_worker, password, hash_rounds)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(_verify_in_worker, plain_password, hashed_password)
+
+def calibrate_hash_rounds(target_ms: float = HASH_TARGET_MS) -> int:
+    """
+    Mide el coste de pbkdf2 en esta máquina (mediana de varias muestras) y
+    ajusta las rondas para acercarse a `target_ms` por hash, sin bajar de
+    HASH_MIN_ROUNDS.
+    Los hashes existentes siguen verificando: cada uno guarda sus rondas.
+    """
+    global hash_rounds
+    if target_ms <= 0:
+        return hash_rounds
+
+    sample_rounds = pbkdf2_sha256.default_rounds
+    samples = []
+    for _ in range(max(1, HASH_CALIBRATION_SAMPLES)):
+        start = time.perf_counter()
+        _hash_in_worker("calibration-password", sample_rounds)
+        samples.append((time.perf_counter() - start) * 1000)
+    # La mediana descarta mediciones aisladas (arranque en frío, otro proceso en la CPU)
+    elapsed_ms = statistics.median(samples)
+
+    rounds = int(sample_rounds * target_ms / elapsed_ms) if elapsed_ms > 0 else sample_rounds
+    hash_rounds = max(HASH_MIN_ROUNDS, rounds)
+    print(f"🔐 pbkdf2_sha256: {hash_rounds} rondas (~{target_ms:.0f} ms objetivo, {elapsed_ms:.1f} ms con {sample_rounds})")
+    return hash_rounds
+
+def shutdown_hash_executor():
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False)
+            _hash_executor = None
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
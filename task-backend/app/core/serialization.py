@@ -0,0 +1,76 @@
+import json
+import os
+from datetime import date, datetime, time
+from typing import Iterable, List, Optional, Sequence
+from fastapi import Response
+from sqlalchemy.orm import Query
+from dotenv import load_dotenv
+from app.models import models
+from app.schemas import tasks as task_schemas
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+load_dotenv()
+
+# Ruta rápida opcional para listados: consultas de columnas (filas, sin
+# instancias ORM ni validación pydantic) codificadas directo a bytes.
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() == "true"
+
+def _default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+def dumps(content) -> bytes:
+    """Mismos bytes que JSONResponse(jsonable_encoder(content)) para fechas, textos y números"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None,
+        separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+def json_response(content, headers: Optional[dict] = None) -> Response:
+    return Response(content=dumps(content), media_type="application/json", headers=headers)
+
+class RowEncoder:
+    """
+    Encoder precompilado de filas a dicts con los campos, en el mismo orden,
+    de un modelo pydantic. Los campos que no son columnas (p. ej. is_overdue)
+    toman el default del modelo, igual que al validar con orm_mode.
+    """
+
+    def __init__(self, schema, entity):
+        table_columns = set(entity.__table__.columns.keys())
+        self.fields = list(schema.__fields__)
+        self.columns = [getattr(entity, field) for field in self.fields if field in table_columns]
+        positions = {column.key: index for index, column in enumerate(self.columns)}
+        self.entity = entity
+        self.template = [
+            (field, positions.get(field), schema.__fields__[field].default)
+            for field in self.fields
+        ]
+
+    def with_columns(self, query: Query, extra_columns: Sequence[str] = ()) -> Query:
+        """
+        Cambia la consulta a columnas; `extra_columns` (p. ej. las del cursor)
+        se agregan al final y no salen en el JSON.
+        """
+        keys = {column.key for column in self.columns}
+        extras = [getattr(self.entity, name) for name in extra_columns if name not in keys]
+        return query.with_entities(*self.columns, *extras)
+
+    def encode_row(self, row) -> dict:
+        return {
+            field: row[index] if index is not None else default
+            for field, index, default in self.template
+        }
+
+    def encode(self, rows: Iterable) -> List[dict]:
+        encode_row = self.encode_row
+        return [encode_row(row) for row in rows]
+
+task_rows = RowEncoder(task_schemas.TaskOut, models.Task)
@@ -0,0 +1,101 @@
+import os
+from typing import Iterable
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.core import data_version, database
+from app.core.jobs import PeriodicJob
+from app.models import models
+
+load_dotenv()
+
+# users.unread_notifications: contador desnormalizado de no leídas. Se ajusta
+# en la misma transacción que cada alta, lectura o borrado de notificaciones;
+# repair() corrige cualquier desvío por lotes de usuarios.
+#
+# Orden de bloqueo (InnoDB): toda transacción que modifica notificaciones
+# bloquea primero la fila de users (lock_users, o data_version.bump antes de
+# tocar notifications) y después las notificaciones. Con un único orden dos
+# transacciones del mismo usuario se esperan en fila y nunca en cruz.
+REPAIR_BATCH_SIZE = int(os.getenv("NOTIFICATION_COUNTER_REPAIR_BATCH_SIZE", 500))
+
+def lock_users(db: Session, user_ids: Iterable[int]):
+    """SELECT ... FOR UPDATE de las filas de users, en orden de id"""
+    db.execute(
+        select(models.User.id)
+        .where(models.User.id.in_(sorted(set(user_ids))))
+        .order_by(models.User.id)
+        .with_for_update()
+    )
+
+def adjust(db: Session, user_id: int, delta: int):
+    """Suma `delta` (puede ser negativo) al contador dentro de la transacción en curso"""
+    if not delta:
+        return
+    db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(unread_notifications=models.User.unread_notifications + delta)
+    )
+
+def current(db: Session, user_id: int) -> int:
+    return db.execute(
+        select(models.User.unread_notifications).where(models.User.id == user_id)
+    ).scalar() or 0
+
+def unread_column(user_id: int):
+    """Subconsulta escalar del contador, para leerlo dentro de otra consulta"""
+    return select(models.User.unread_notifications).where(models.User.id == user_id).scalar_subquery()
+
+def repair(batch_size: int = REPAIR_BATCH_SIZE) -> dict:
+    """
+    Recalcula el contador de todos los usuarios por lotes de ids (keyset).
+    Cada lote bloquea sus filas de users (FOR UPDATE) antes de contar: una
+    escritura concurrente espera al commit del lote y luego ajusta sobre el
+    valor ya corregido, así la reparación no pisa incrementos en curso.
+    Sube data_version de cada usuario corregido (ETag y /notifications/stream).
+    """
+    checked = fixed = 0
+    last_id = 0
+    while True:
+        with database.SessionLocal() as db:
+            stored = db.execute(
+                select(models.User.id, models.User.unread_notifications)
+                .where(models.User.id > last_id)
+                .order_by(models.User.id)
+                .limit(batch_size)
+                .with_for_update()
+            ).all()
+            if not stored:
+                return {"users_checked": checked, "users_fixed": fixed}
+
+            user_ids = [user_id for user_id, _ in stored]
+            actual = dict(db.execute(
+                select(models.Notification.user_id, func.count(models.Notification.id))
+                .where(models.Notification.user_id.in_(user_ids), models.Notification.is_read == False)
+                .group_by(models.Notification.user_id)
+            ).all())
+            for user_id, unread in stored:
+                if unread != actual.get(user_id, 0):
+                    db.execute(
+                        update(models.User)
+                        .where(models.User.id == user_id)
+                        .values(unread_notifications=actual.get(user_id, 0))
+                    )
+                    data_version.bump(db, user_id)
+                    fixed += 1
+            db.commit()
+
+        checked += len(stored)
+        last_id = user_ids[-1]
+
+repair_job = PeriodicJob(
+    "unread-counter-repair",
+    repair,
+    float(os.getenv("NOTIFICATION_COUNTER_REPAIR_INTERVAL_SECONDS", 3600)),
+    exclusive=True,
+)
+
+if __name__ == "__main__":
+    # Reparación manual: python -m app.core.unread_counter
+    print(repair())
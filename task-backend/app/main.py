@@ -1,17 +1,36 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import tasks, auth, user, notifications, categories  # AGREGAR categories
+from app.api.routes import tasks, auth, user, notifications, categories, health  # AGREGAR categories
 
 from app.core.database import engine, Base
+from app.core import security, rate_limiting, search
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
 from app.core.config import ALLOWED_ORIGINS
+from app.core.rate_limit_middleware import RateLimitMiddleware
+from app.core.rate_limiting import api_rate_limiter
+from app.core.notification_bus import notification_fanout
+from app.core.unread_counter import repair_job as unread_counter_repair_job
+from app.core.notification_retention import purge_job as notification_purge_job
 
 app = FastAPI(title="API Gestor de Tareas")
 
+# Límites por ruta (prefijo -> limitador; None = sin límite en el middleware).
+# /auth maneja su propio límite de intentos fallidos en routes/auth.py.
+RATE_LIMITS = {
+    "/auth": None,
+    "/docs": None,
+    "/openapi.json": None,
+    "/health": None,
+}
+
+# Rate limiting antes de dependencias/DB (se agrega antes que CORS para que
+# las respuestas 429 también lleven cabeceras CORS)
+app.add_middleware(RateLimitMiddleware, default_limiter=api_rate_limiter, route_limits=RATE_LIMITS)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,11 +46,36 @@ app.include_router(auth.router, prefix="", tags=["Auth"])
 app.include_router(user.router, prefix="", tags=["User"])
 app.include_router(notifications.router, prefix="", tags=["Notifications"])
 app.include_router(categories.router, prefix="", tags=["Categories"])  # NUEVA LÍNEA
+app.include_router(health.router, prefix="", tags=["Health"])
 
 @app.on_event("startup")
 def on_startup():
-    # crear tablas si no existen (solo en dev; en prod usa migraciones)
-    Base.metadata.create_all(bind=engine)
+    # El esquema se gestiona con Alembic (`alembic upgrade head`) fuera del arranque.
+    # AUTO_CREATE_TABLES=true solo para desarrollo local sin migraciones.
+    if os.getenv("AUTO_CREATE_TABLES", "false").lower() == "true":
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            search.ensure_sqlite_search_schema(connection)
+    # ajustar rondas de pbkdf2 a la latencia objetivo configurada
+    security.calibrate_hash_rounds()
+    # pool de hashing (forkserver) antes de lanzar los hilos de fondo
+    security.start_hash_executor()
+    # barrido periódico de claves inactivas del rate limiter
+    rate_limiting.start_sweepers()
+    # avisos de /notifications/stream entre workers (no-op con el backend memory)
+    notification_fanout.start()
+    # reconciliación periódica del contador de no leídas
+    unread_counter_repair_job.start()
+    # purga por lotes de notificaciones vencidas (NOTIFICATION_RETENTION_*)
+    notification_purge_job.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    security.shutdown_hash_executor()
+    rate_limiting.stop_sweepers()
+    notification_fanout.stop()
+    unread_counter_repair_job.stop()
+    notification_purge_job.stop()
 
 @app.get("/")
 def root():
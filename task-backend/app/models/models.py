@@ -1,5 +1,6 @@
 # app/models/models.py
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Boolean, Text, ForeignKey, func
+from datetime import datetime
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, Time, DateTime, Boolean, Text, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -10,10 +11,18 @@ class User(Base):
     email = Column(String(200), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=False), server_default=func.now())
+    # Sube con cada escritura de tareas/categorías/notificaciones (ETag, ver core/data_version.py)
+    data_version = Column(Integer, default=0, nullable=False)
+    # Notificaciones no leídas, mantenido por las escrituras (ver core/unread_counter.py)
+    unread_notifications = Column(Integer, default=0, nullable=False)
 
     tasks = relationship("Task", back_populates="owner", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
     categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")  # NUEVA LÍNEA
+    notification_archive = relationship("NotificationArchive", back_populates="user", cascade="all, delete-orphan", uselist=False)
+
+# Valor de due_sort_key para tareas sin fecha: ordenan al final
+NO_DUE_DATE_SORT_KEY = datetime(9999, 12, 31, 23, 59, 59)
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -31,11 +40,27 @@ class Task(Base):
     updated_at = Column(DateTime(timezone=False), onupdate=func.now(), server_default=func.now())
     completed_at = Column(DateTime(timezone=False), nullable=True)
     is_completed = Column(Boolean, default=False, nullable=False)
+    # Score de prioridad persistido (ver app/core/priority_queue.py)
+    priority_rank = Column(SmallInteger, default=2, nullable=False)
+    due_sort_key = Column(DateTime(timezone=False), default=NO_DUE_DATE_SORT_KEY, nullable=False)
 
     owner = relationship("User", back_populates="tasks")
     category = relationship("Category", back_populates="tasks")  # NUEVA LÍNEA
     notifications = relationship("Notification", back_populates="task", cascade="all, delete-orphan")
 
+    # Índices compuestos según las consultas de routes/tasks.py y categories.py
+    __table_args__ = (
+        Index(
+            "ix_tasks_user_priority",
+            "user_id", "priority_rank", "due_sort_key", important.desc(), "is_completed", "id"
+        ),
+        Index("ix_tasks_user_created", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_tasks_user_completed_due", "user_id", "is_completed", "due_date"),
+        Index("ix_tasks_user_category", "user_id", "category_id"),
+        Index("ix_tasks_category", "category_id"),
+    )
+
 class Notification(Base):
     __tablename__ = "notifications"
     id = Column(Integer, primary_key=True, index=True)
@@ -48,6 +73,27 @@ class Notification(Base):
     task = relationship("Task", back_populates="notifications")
     user = relationship("User", back_populates="notifications")
 
+    # Índices según las consultas de routes/notifications.py
+    __table_args__ = (
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+        Index("ix_notifications_task", "task_id"),
+        # purga por retención (core/notification_retention.py), keyset por (created_at, id)
+        Index("ix_notifications_created", "created_at", "id"),
+    )
+
+class NotificationArchive(Base):
+    """Resumen compactado de las notificaciones purgadas por retención (una fila por usuario)"""
+    __tablename__ = "notification_archives"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    archived_count = Column(Integer, default=0, nullable=False)
+    archived_unread = Column(Integer, default=0, nullable=False)
+    oldest_created_at = Column(DateTime(timezone=False), nullable=True)
+    newest_created_at = Column(DateTime(timezone=False), nullable=True)
+    last_archived_at = Column(DateTime(timezone=False), nullable=True)
+
+    user = relationship("User", back_populates="notification_archive")
+
 # NUEVA CLASE COMPLETA
 class Category(Base):
     __tablename__ = "categories"
@@ -59,4 +105,8 @@ class Category(Base):
     created_at = Column(DateTime(timezone=False), server_default=func.now())
 
     user = relationship("User", back_populates="categories")
-    tasks = relationship("Task", back_populates="category")
\ No newline at end of file
+    tasks = relationship("Task", back_populates="category")
+
+    __table_args__ = (
+        Index("ix_categories_user_name", "user_id", "name"),
+    )
\ No newline at end of file
@@ -18,6 +18,24 @@ class NotificationListResponse(BaseModel):
     notifications: list[NotificationOut]
     total: int
     unread_count: int
+    next_cursor: Optional[str] = None  # solo en modo cursor, si hay más
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
+
+class StreamTicketResponse(BaseModel):
+    ticket: str
+    expires_in: int  # segundos
+
+class NotificationArchiveOut(BaseModel):
+    """Resumen de las notificaciones purgadas por la política de retención"""
+    archived_count: int = 0
+    archived_unread: int = 0
+    oldest_created_at: Optional[datetime] = None
+    newest_created_at: Optional[datetime] = None
+    last_archived_at: Optional[datetime] = None
+    retention_read_days: int
+    retention_unread_days: int
 
 # Compatibilidad Pydantic v2
 try:
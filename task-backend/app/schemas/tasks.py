@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, Field, validator
 from enum import Enum
 from datetime import date, datetime, time
@@ -74,12 +74,70 @@ class TaskOut(BaseModel):
 
 class TaskListResponse(BaseModel):
     tasks: List[TaskOut]
-    total: int
-    page: int
+    total: Optional[int] = None  # None con include_total=false
+    page: Optional[int] = None  # None en modo cursor
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+class BulkOperationType(str, Enum):
+    create = "create"
+    update = "update"
+    delete = "delete"
+
+class BulkTaskOperation(BaseModel):
+    op: BulkOperationType
+    id: Optional[int] = None  # requerido en update/delete
+    data: Optional[dict] = None  # TaskCreate en create, TaskUpdate en update
+
+class BulkTaskRequest(BaseModel):
+    operations: List[BulkTaskOperation] = Field(..., min_items=1, max_items=500)
+    atomic: bool = False  # True: si una operación falla no se aplica ninguna
+
+class BulkTaskResult(BaseModel):
+    index: int
+    op: BulkOperationType
+    status: str  # ok | error | skipped
+    id: Optional[int] = None
+    task: Optional[TaskOut] = None
+    error: Optional[Any] = None
+
+class BulkTaskResponse(BaseModel):
+    results: List[BulkTaskResult]
+    succeeded: int
+    failed: int
+
+class TaskImportError(BaseModel):
+    row: int  # línea del archivo (CSV: incluye el encabezado)
+    error: Any
+
+class TaskImportResponse(BaseModel):
+    inserted: int
+    failed: int
+    categories_created: int
+    errors: List[TaskImportError]
+    errors_truncated: bool = False
+
+class CategoryStats(BaseModel):
+    category_id: Optional[int] = None  # None: tareas sin categoría
+    name: Optional[str] = None
+    total: int
+    completed: int
+
+class TaskStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_category: List[CategoryStats]
+    important: int
+    overdue: int
+    due_this_week: int
 
 try:
     from pydantic import ConfigDict
@@ -0,0 +1,116 @@
+"""
+Benchmark de TaskPriorityQueue: la versión anterior (heappush uno a uno,
+copia del heap + pops, instancias ORM) frente a la actual (heapify en bloque,
+frontera de índices para top-k), más la selección parcial con nsmallest y
+registros livianos con __slots__ en lugar de instancias ORM.
+
+Uso (desde task-backend/):
+    python -m benchmarks.bench_priority_queue [n1 n2 ...]
+"""
+import gc
+import heapq
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, time as dtime, timedelta
+
+from app.core.priority_queue import TaskPriorityQueue
+from app.models import models
+
+TOP_K = 10
+
+class TaskRecord:
+    """Registro liviano con solo las columnas que usa el score de prioridad"""
+    __slots__ = ("id", "priority", "due_date", "due_time", "important", "is_completed")
+
+    def __init__(self, id, priority, due_date, due_time, important, is_completed):
+        self.id = id
+        self.priority = priority
+        self.due_date = due_date
+        self.due_time = due_time
+        self.important = important
+        self.is_completed = is_completed
+
+def top_k(tasks, limit):
+    """Top-k de una sola lectura sin construir el heap: heapq.nsmallest, O(n log k)"""
+    score = TaskPriorityQueue()._get_priority_score
+    entries = heapq.nsmallest(limit, ((score(task), task) for task in tasks))
+    return [task for priority_score, task in entries]
+
+class LegacyTaskPriorityQueue(TaskPriorityQueue):
+    """Implementación anterior de push_all / get_priority_list"""
+
+    def push_all(self, tasks):
+        for task in tasks:
+            self.push(task)
+
+    def get_priority_list(self, limit=None):
+        sorted_tasks = []
+        temp_heap = self.heap.copy()
+        while temp_heap and (limit is None or len(sorted_tasks) < limit):
+            priority_score, task = heapq.heappop(temp_heap)
+            sorted_tasks.append(task)
+        return sorted_tasks
+
+def random_rows(n: int):
+    rng = random.Random(42)
+    today = date.today()
+    for i in range(1, n + 1):
+        due = today + timedelta(days=rng.randint(0, 60)) if rng.random() < 0.7 else None
+        yield (
+            i,
+            rng.choice(("low", "medium", "high", "urgent")),
+            due,
+            dtime(rng.randint(0, 23), 0) if due and rng.random() < 0.3 else None,
+            rng.random() < 0.3,
+            rng.random() < 0.2,
+        )
+
+def orm_task(row):
+    id, priority, due_date, due_time, important, is_completed = row
+    return models.Task(
+        id=id, title=f"Tarea {id}", description="x" * 200, priority=priority,
+        status="pending", due_date=due_date, due_time=due_time,
+        important=important, is_completed=is_completed, user_id=1
+    )
+
+def measure(queue_class, build, n: int):
+    gc.collect()
+    tracemalloc.start()
+    tasks = [build(row) for row in random_rows(n)]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue = queue_class()
+    start = time.perf_counter()
+    queue.push_all(tasks)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    top = queue.get_priority_list(TOP_K)
+    top_ms = (time.perf_counter() - start) * 1000
+
+    # Lectura única sin heap (solo la clase actual la tiene)
+    select_ms = None
+    if queue_class is not LegacyTaskPriorityQueue:
+        start = time.perf_counter()
+        assert [t.id for t in top_k(tasks, TOP_K)] == [t.id for t in top]
+        select_ms = (time.perf_counter() - start) * 1000
+    return memory, build_ms, top_ms, select_ms, [task.id for task in top]
+
+def run(sizes):
+    for n in sizes:
+        legacy = measure(LegacyTaskPriorityQueue, orm_task, n)
+        current = measure(TaskPriorityQueue, lambda row: TaskRecord(*row), n)
+        assert legacy[-1] == current[-1], "el top-k no coincide"
+        print(f"n={n:,}")
+        for name, (memory, build_ms, top_ms, select_ms, _) in (("anterior (ORM)", legacy), ("actual (TaskRecord)", current)):
+            line = (f"  {name:20} memoria {memory / 1024 / 1024:8.1f} MiB"
+                    f" | push_all {build_ms:9.1f} ms | top-{TOP_K} {top_ms:8.3f} ms")
+            if select_ms is not None:
+                line += f" | top_k sin heap {select_ms:8.1f} ms"
+            print(line)
+
+if __name__ == "__main__":
+    run([int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
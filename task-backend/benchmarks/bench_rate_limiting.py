@@ -0,0 +1,44 @@
+"""
+Benchmark del RateLimiter: memoria y operaciones/segundo con 1M de claves.
+
+Uso (desde task-backend/):
+    python -m benchmarks.bench_rate_limiting [num_keys]
+"""
+import sys
+import time
+import tracemalloc
+
+from app.core.rate_limiting import RateLimiter
+
+def run(num_keys: int = 1_000_000):
+    limiter = RateLimiter(max_requests=60, window_seconds=60)
+    keys = [f"{i}:10.0.{i % 256}.{i // 256 % 256}" for i in range(num_keys)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for key in keys:
+        if not limiter.is_blocked(key):
+            limiter.record_request(key)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ops = num_keys * 2
+    print(f"claves: {len(limiter):,}")
+    print(f"memoria del limiter: {current / 1024 / 1024:.1f} MiB ({current / num_keys:.0f} B/clave)")
+    print(f"is_blocked + record_request: {ops / elapsed:,.0f} ops/s")
+
+    start = time.perf_counter()
+    for key in keys:
+        limiter.record_request(key)
+    elapsed = time.perf_counter() - start
+    print(f"record_request (claves existentes): {num_keys / elapsed:,.0f} ops/s")
+
+    # Simular que las ventanas expiraron y barrer
+    limiter.requests = {key: (index - 10, prev, cur) for key, (index, prev, cur) in limiter.requests.items()}
+    start = time.perf_counter()
+    removed = limiter.sweep()
+    print(f"sweep: {removed:,} claves inactivas eliminadas en {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
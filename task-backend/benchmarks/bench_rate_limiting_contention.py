@@ -0,0 +1,51 @@
+"""
+Benchmark de contención: varios hilos verificando el rate limit a la vez,
+como los workers del threadpool en get_current_user_with_rate_limit.
+
+Compara el RateLimiter de un solo lock (is_blocked + record_request) con el
+ShardedRateLimiter (check_and_record, un lock por stripe).
+
+Uso (desde task-backend/):
+    python -m benchmarks.bench_rate_limiting_contention [threads] [ops_por_hilo]
+"""
+import sys
+import time
+from threading import Barrier, Thread
+
+from app.core.rate_limiting import RateLimiter, ShardedRateLimiter
+
+def single_lock(limiter, key):
+    if not limiter.is_blocked(key):
+        limiter.record_request(key)
+
+def striped(limiter, key):
+    limiter.check_and_record(key)
+
+def measure(limiter, check, threads: int, ops_per_thread: int) -> float:
+    barrier = Barrier(threads + 1)
+
+    def worker(thread_id):
+        keys = [f"{thread_id * ops_per_thread + i}:127.0.0.1" for i in range(1000)]
+        barrier.wait()
+        for i in range(ops_per_thread):
+            check(limiter, keys[i % 1000])
+
+    workers = [Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    return threads * ops_per_thread / (time.perf_counter() - start)
+
+def run(threads: int = 40, ops_per_thread: int = 20_000):
+    single = measure(RateLimiter(10**9, 60), single_lock, threads, ops_per_thread)
+    sharded = measure(ShardedRateLimiter(10**9, 60, stripes=16), striped, threads, ops_per_thread)
+    print(f"{threads} hilos x {ops_per_thread:,} solicitudes")
+    print(f"RateLimiter (1 lock, 2 llamadas):          {single:,.0f} req/s")
+    print(f"ShardedRateLimiter (16 stripes, 1 llamada): {sharded:,.0f} req/s ({sharded / single:.2f}x)")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
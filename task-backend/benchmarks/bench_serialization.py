@@ -0,0 +1,92 @@
+"""
+Benchmark de la serialización de /listarTareas: la ruta normal (instancias
+ORM -> validación TaskListResponse con orm_mode -> jsonable_encoder -> json)
+frente a la ruta rápida de FAST_SERIALIZATION (filas de columnas ->
+RowEncoder -> orjson). Verifica que ambas produzcan exactamente los mismos bytes.
+
+Uso (desde task-backend/):
+    python -m benchmarks.bench_serialization [n1 n2 ...]
+"""
+import random
+import sys
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import serialization
+from app.core.database import Base
+from app.core.priority_queue import set_priority_sort_columns
+from app.models import models
+from app.schemas import tasks as schemas
+
+ROUNDS = 20
+TITLES = ("Comprar pan", "Revisar informe ñandú", "Llamar a José 📞", 'Texto con "comillas" y \\ barra', "Línea\ncon salto")
+
+def seed(session, n: int):
+    rng = random.Random(42)
+    now = datetime(2026, 1, 1, 8, 30, 15, 123456)
+    session.add(models.User(id=1, name="bench", email="bench@example.com", hashed_password="x"))
+    for i in range(1, n + 1):
+        due = date(2026, 1, 1) + timedelta(days=rng.randint(0, 60)) if rng.random() < 0.7 else None
+        completed = rng.random() < 0.2
+        task = models.Task(
+            id=i, title=f"{rng.choice(TITLES)} {i}", description=None if rng.random() < 0.3 else "x" * rng.randint(1, 300),
+            due_date=due, due_time=dtime(rng.randint(0, 23), 15) if due and rng.random() < 0.3 else None,
+            priority=rng.choice(("low", "medium", "high", "urgent")),
+            status="completed" if completed else rng.choice(("pending", "in_progress")),
+            important=rng.random() < 0.3, is_completed=completed, user_id=1,
+            created_at=now + timedelta(seconds=i), updated_at=now + timedelta(seconds=i, microseconds=i % 7),
+            completed_at=now if completed else None,
+        )
+        set_priority_sort_columns(task)
+        session.add(task)
+    session.commit()
+
+def page(tasks) -> dict:
+    return {"tasks": tasks, "total": len(tasks), "page": 1, "limit": len(tasks), "total_pages": 1,
+            "has_next": False, "has_prev": False, "next_cursor": None}
+
+def standard(session) -> bytes:
+    tasks = session.query(models.Task).order_by(models.Task.id).all()
+    model = schemas.TaskListResponse.parse_obj(page(tasks))
+    return JSONResponse(jsonable_encoder(model)).body
+
+def fast(session) -> bytes:
+    query = session.query(models.Task).order_by(models.Task.id)
+    rows = serialization.task_rows.with_columns(query).all()
+    return serialization.json_response(page(serialization.task_rows.encode(rows))).body
+
+def measure(fn, session_factory):
+    timings = []
+    for _ in range(ROUNDS):
+        session = session_factory()
+        start = time.perf_counter()
+        body = fn(session)
+        timings.append((time.perf_counter() - start) * 1000)
+        session.close()
+    timings.sort()
+    return body, timings[len(timings) // 2]
+
+def run(sizes):
+    print(f"encoder: {'orjson' if serialization.orjson is not None else 'json (stdlib)'}")
+    for n in sizes:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as session:
+            seed(session, n)
+
+        standard_body, standard_ms = measure(standard, session_factory)
+        fast_body, fast_ms = measure(fast, session_factory)
+        assert standard_body == fast_body, "la ruta rápida no produce los mismos bytes"
+        print(f"n={n:,} ({len(fast_body) / 1024:.0f} KiB, bytes idénticos)")
+        print(f"  normal (ORM + pydantic) {standard_ms:9.2f} ms")
+        print(f"  rápida (filas + {'orjson' if serialization.orjson else 'json'})  {fast_ms:9.2f} ms  x{standard_ms / fast_ms:.1f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    run([int(n) for n in sys.argv[1:]] or [100, 1_000, 10_000])
@@ -0,0 +1,49 @@
+# migrations/env.py
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import engine, Base, DATABASE_URL
+from app.models import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Objetos de búsqueda de texto completo creados con SQL crudo (0004):
+# no están en los modelos y autogenerate no debe intentar borrarlos
+SEARCH_OBJECTS = ("tasks_fts", "ft_tasks_title_description")
+
+def include_object(obj, name, type_, reflected, compare_to):
+    return not (name and name.startswith(SEARCH_OBJECTS))
+
+def run_migrations_offline():
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite no soporta ALTER de columnas: usar batch mode
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,82 @@
+"""Esquema inicial (el que creaba Base.metadata.create_all al arrancar)
+
+Las bases existentes ya tienen estas tablas: la migración solo crea las que
+faltan, así `alembic upgrade head` funciona tanto en una DB nueva como en una
+creada por la versión anterior de la app.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(200), nullable=False),
+            sa.Column("email", sa.String(200), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "categories" not in existing:
+        op.create_table(
+            "categories",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("color", sa.String(7), nullable=False),
+            sa.Column("icon", sa.String(50), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+        op.create_index("ix_categories_id", "categories", ["id"])
+
+    if "tasks" not in existing:
+        op.create_table(
+            "tasks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("due_date", sa.Date(), nullable=True),
+            sa.Column("due_time", sa.Time(), nullable=True),
+            sa.Column("priority", sa.String(20), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("important", sa.Boolean(), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.Column("is_completed", sa.Boolean(), nullable=False),
+        )
+        op.create_index("ix_tasks_id", "tasks", ["id"])
+
+    if "notifications" not in existing:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("task_id", sa.Integer(), sa.ForeignKey("tasks.id"), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("message", sa.String(255), nullable=False),
+            sa.Column("is_read", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        )
+        op.create_index("ix_notifications_id", "notifications", ["id"])
+
+def downgrade():
+    op.drop_table("notifications")
+    op.drop_table("tasks")
+    op.drop_table("categories")
+    op.drop_table("users")
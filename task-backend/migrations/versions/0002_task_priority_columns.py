@@ -0,0 +1,95 @@
+"""Columnas persistidas del score de prioridad en tasks (+ backfill)
+
+Reemplaza a scripts/backfill_priority_columns.py. Si las columnas ya existen
+(p. ej. se corrió ese script) solo completa el backfill.
+
+Revision ID: 0002_task_priority_columns
+Revises: 0001_initial_schema
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_task_priority_columns"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+# Copia congelada de PRIORITY_MAP / NO_DUE_DATE_SORT_KEY al momento de la migración
+PRIORITY_MAP = {"urgent": 0, "high": 1, "medium": 2, "low": 3}
+NO_DUE_DATE_SORT_KEY = datetime(9999, 12, 31, 23, 59, 59)
+BATCH_SIZE = 1000
+
+tasks = sa.table(
+    "tasks",
+    sa.column("id", sa.Integer),
+    sa.column("priority", sa.String),
+    sa.column("due_date", sa.Date),
+    sa.column("due_time", sa.Time),
+    sa.column("priority_rank", sa.SmallInteger),
+    sa.column("due_sort_key", sa.DateTime),
+)
+
+def _sort_values(dialect_name: str) -> dict:
+    """priority_rank y due_sort_key calculados en SQL (mismo resultado que priority_sort_columns)"""
+    priority_rank = sa.case(PRIORITY_MAP, value=tasks.c.priority, else_=2)
+    if dialect_name == "sqlite":
+        # Mismo texto que escribe SQLAlchemy: 'YYYY-MM-DD HH:MM:SS.ffffff'
+        due = tasks.c.due_date.op("||")(" ").op("||")(sa.func.coalesce(tasks.c.due_time, "00:00:00.000000"))
+    else:
+        due = sa.func.timestamp(tasks.c.due_date, sa.func.coalesce(tasks.c.due_time, "00:00:00"))
+    due_sort_key = sa.case(
+        (tasks.c.due_date.is_(None), sa.literal(NO_DUE_DATE_SORT_KEY, sa.DateTime)),
+        else_=due,
+    )
+    return {"priority_rank": priority_rank, "due_sort_key": due_sort_key}
+
+def _backfill(bind):
+    """
+    Un UPDATE por conjuntos (CASE) por cada rango de BATCH_SIZE ids, fuera de
+    la transacción de la migración: cada lote se confirma al terminar y solo
+    bloquea sus filas mientras dura.
+    """
+    values = _sort_values(bind.dialect.name)
+    last_id = 0
+    with op.get_context().autocommit_block():
+        while True:
+            ids = bind.execute(
+                sa.select(tasks.c.id).where(tasks.c.id > last_id).order_by(tasks.c.id).limit(BATCH_SIZE)
+            ).scalars().all()
+            if not ids:
+                return
+            bind.execute(
+                tasks.update().where(tasks.c.id >= ids[0], tasks.c.id <= ids[-1]).values(**values)
+            )
+            last_id = ids[-1]
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("tasks")}
+
+    with op.batch_alter_table("tasks") as batch:
+        if "priority_rank" not in columns:
+            batch.add_column(sa.Column("priority_rank", sa.SmallInteger(), nullable=False, server_default="2"))
+        if "due_sort_key" not in columns:
+            batch.add_column(sa.Column(
+                "due_sort_key", sa.DateTime(), nullable=False,
+                server_default=sa.text("'9999-12-31 23:59:59'")
+            ))
+
+    _backfill(bind)
+
+    indexes = {index["name"] for index in sa.inspect(bind).get_indexes("tasks")}
+    if "ix_tasks_user_priority" not in indexes:
+        op.create_index(
+            "ix_tasks_user_priority", "tasks",
+            ["user_id", "priority_rank", "due_sort_key", sa.text("important DESC"), "is_completed", "id"]
+        )
+
+def downgrade():
+    op.drop_index("ix_tasks_user_priority", table_name="tasks")
+    with op.batch_alter_table("tasks") as batch:
+        batch.drop_column("due_sort_key")
+        batch.drop_column("priority_rank")
@@ -0,0 +1,46 @@
+"""Índices compuestos para las consultas de tasks, notifications y categories
+
+Revision ID: 0003_composite_indexes
+Revises: 0002_task_priority_columns
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_composite_indexes"
+down_revision = "0002_task_priority_columns"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # list_tasks: filtro por usuario, orden por created_at (+ id de desempate)
+    ("ix_tasks_user_created", "tasks", ["user_id", "created_at", "id"]),
+    # list_tasks?status=...
+    ("ix_tasks_user_status_created", "tasks", ["user_id", "status", "created_at"]),
+    # tareas pendientes / próximas a vencer
+    ("ix_tasks_user_completed_due", "tasks", ["user_id", "is_completed", "due_date"]),
+    # list_tasks?category_id=..., conteo de tareas por categoría
+    ("ix_tasks_user_category", "tasks", ["user_id", "category_id"]),
+    # delete_category (UPDATE ... WHERE category_id = ?)
+    ("ix_tasks_category", "tasks", ["category_id"]),
+    # /notifications (todas y filtradas por is_read), ordenadas por fecha
+    ("ix_notifications_user_created", "notifications", ["user_id", "created_at"]),
+    ("ix_notifications_user_read_created", "notifications", ["user_id", "is_read", "created_at"]),
+    ("ix_notifications_task", "notifications", ["task_id"]),
+    # verificación de nombre duplicado por usuario
+    ("ix_categories_user_name", "categories", ["user_id", "name"]),
+]
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in ("tasks", "notifications", "categories")
+    }
+    for name, table, columns in INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, columns)
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,53 @@
+"""Índice de texto completo para el filtro `q` de /listarTareas
+
+MySQL: índice FULLTEXT sobre tasks(title, description).
+SQLite: tabla FTS5 de contenido externo + triggers de sincronización.
+
+Revision ID: 0004_task_search_index
+Revises: 0003_composite_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_task_search_index"
+down_revision = "0003_composite_indexes"
+branch_labels = None
+depends_on = None
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    " title, description, content='tasks', content_rowid='id',"
+    " tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN"
+    " INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN"
+    " INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN"
+    " INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+    " INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);"
+    " END",
+]
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql":
+        indexes = {index["name"] for index in sa.inspect(bind).get_indexes("tasks")}
+        if "ft_tasks_title_description" not in indexes:
+            op.execute("ALTER TABLE tasks ADD FULLTEXT INDEX ft_tasks_title_description (title, description)")
+    elif bind.dialect.name == "sqlite":
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+        # Indexar las filas existentes
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql":
+        op.execute("ALTER TABLE tasks DROP INDEX ft_tasks_title_description")
+    elif bind.dialect.name == "sqlite":
+        for trigger in ("tasks_fts_ai", "tasks_fts_ad", "tasks_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
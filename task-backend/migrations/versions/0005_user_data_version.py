@@ -0,0 +1,23 @@
+"""Versión de datos por usuario (users.data_version) para ETag
+
+Revision ID: 0005_user_data_version
+Revises: 0004_task_search_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_user_data_version"
+down_revision = "0004_task_search_index"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("users")}
+    if "data_version" not in columns:
+        with op.batch_alter_table("users") as batch:
+            batch.add_column(sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"))
+
+def downgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("data_version")
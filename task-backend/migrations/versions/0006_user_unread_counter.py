@@ -0,0 +1,61 @@
+"""Contador desnormalizado de notificaciones no leídas (users.unread_notifications)
+
+Revision ID: 0006_user_unread_counter
+Revises: 0005_user_data_version
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_user_unread_counter"
+down_revision = "0005_user_data_version"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+users = sa.table("users", sa.column("id", sa.Integer), sa.column("unread_notifications", sa.Integer))
+notifications = sa.table(
+    "notifications",
+    sa.column("id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("is_read", sa.Boolean),
+)
+
+def _backfill(bind):
+    """
+    Cuenta las no leídas por lotes de usuarios, fuera de la transacción de la
+    migración (como 0002): cada lote se confirma al terminar y solo bloquea
+    sus filas mientras dura.
+    """
+    unread = (
+        sa.select(sa.func.count(notifications.c.id))
+        .where(notifications.c.user_id == users.c.id, notifications.c.is_read == sa.false())
+        .scalar_subquery()
+    )
+    last_id = 0
+    with op.get_context().autocommit_block():
+        while True:
+            ids = bind.execute(
+                sa.select(users.c.id).where(users.c.id > last_id).order_by(users.c.id).limit(BATCH_SIZE)
+            ).scalars().all()
+            if not ids:
+                return
+            bind.execute(
+                users.update()
+                .where(users.c.id >= ids[0], users.c.id <= ids[-1])
+                .values(unread_notifications=unread)
+            )
+            last_id = ids[-1]
+
+def upgrade():
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("users")}
+    if "unread_notifications" not in columns:
+        with op.batch_alter_table("users") as batch:
+            batch.add_column(sa.Column("unread_notifications", sa.Integer(), nullable=False, server_default="0"))
+    _backfill(bind)
+
+def downgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("unread_notifications")
@@ -0,0 +1,35 @@
+"""Retención de notificaciones: índice por fecha y tabla de resumen archivado
+
+Revision ID: 0007_notification_retention
+Revises: 0006_user_unread_counter
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_notification_retention"
+down_revision = "0006_user_unread_counter"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if "notification_archives" not in inspector.get_table_names():
+        op.create_table(
+            "notification_archives",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("archived_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("archived_unread", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("oldest_created_at", sa.DateTime(), nullable=True),
+            sa.Column("newest_created_at", sa.DateTime(), nullable=True),
+            sa.Column("last_archived_at", sa.DateTime(), nullable=True),
+        )
+
+    indexes = {index["name"] for index in inspector.get_indexes("notifications")}
+    if "ix_notifications_created" not in indexes:
+        op.create_index("ix_notifications_created", "notifications", ["created_at", "id"])
+
+def downgrade():
+    op.drop_index("ix_notifications_created", table_name="notifications")
+    op.drop_table("notification_archives")
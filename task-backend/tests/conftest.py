@@ -0,0 +1,43 @@
+import itertools
+import os
+import sys
+import tempfile
+
+# Configuración antes de importar la app: SQLite temporal y límites holgados
+_db_dir = tempfile.mkdtemp(prefix="task-api-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'tests.db')}"
+os.environ["AUTO_CREATE_TABLES"] = "true"
+os.environ["RATE_LIMIT_API_PER_MIN"] = "100000"
+os.environ["RATE_LIMIT_SQLITE_PATH"] = os.path.join(_db_dir, "rate-limits.db")
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["PASSWORD_HASH_ROUNDS"] = "1000"
+os.environ["PASSWORD_HASH_MIN_ROUNDS"] = "1000"
+os.environ["NOTIFICATION_COUNTER_REPAIR_INTERVAL_SECONDS"] = "0"
+os.environ["NOTIFICATION_PURGE_INTERVAL_SECONDS"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+
+_user_ids = itertools.count(1)
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def register(client):
+    """Registra un usuario nuevo y devuelve sus cabeceras Authorization"""
+    def register_user():
+        n = next(_user_ids)
+        response = client.post("/auth/register", json={"name": f"user{n}", "email": f"user{n}@test.com", "password": "secret1"})
+        assert response.status_code == 201, response.text
+        return {"Authorization": "Bearer " + response.json()["access_token"]}
+    return register_user
+
+@pytest.fixture
+def auth_headers(register):
+    return register()
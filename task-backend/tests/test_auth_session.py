@@ -0,0 +1,39 @@
+from sqlalchemy import event
+from app.core import database
+from app.core.cache import user_cache
+
+def test_authenticated_request_checks_out_one_connection(client, auth_headers):
+    checkouts = []
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.append(connection_record)
+
+    # Sin caché, la autenticación también consulta la DB
+    user_cache.clear()
+    event.listen(database.engine.pool, "checkout", on_checkout)
+    try:
+        response = client.get("/user", headers=auth_headers)
+    finally:
+        event.remove(database.engine.pool, "checkout", on_checkout)
+
+    assert response.status_code == 200
+    assert len(checkouts) == 1
+
+def test_password_checks_ignore_cached_user_after_change_elsewhere(client, auth_headers):
+    from app.core import security
+    from app.models import models
+
+    # Usuario en la caché de este proceso
+    user_id = client.get("/user", headers=auth_headers).json()["id"]
+
+    # Cambio de contraseña atendido por otro worker: no invalida esta caché
+    db = database.SessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).update({"hashed_password": security.hash_password("nueva1")})
+        db.commit()
+    finally:
+        db.close()
+
+    assert client.put("/user", json={"name": "x", "current_password": "secret1"}, headers=auth_headers).status_code == 400
+    assert client.request("DELETE", "/user", json={"current_password": "secret1"}, headers=auth_headers).status_code == 400
+    assert client.put("/user", json={"name": "x", "current_password": "nueva1"}, headers=auth_headers).status_code == 200
@@ -0,0 +1,78 @@
+from sqlalchemy import event
+from app.core import database
+
+def _statements(client, method, url, **kwargs):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = getattr(client, method)(url, **kwargs)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+    return response, statements
+
+def test_bulk_create_uses_one_insert(client, auth_headers):
+    operations = [{"op": "create", "data": {"title": f"t{i}", "priority": "high"}} for i in range(5)]
+
+    response, statements = _statements(client, "post", "/tasks/bulk", json={"operations": operations}, headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 5
+    assert len([s for s in statements if s.startswith("INSERT INTO tasks")]) == 1
+
+    # Cada resultado trae el id real de su fila, en el orden de la solicitud
+    for i, result in enumerate(body["results"]):
+        task = client.get(f"/listarTarea/{result['id']}", headers=auth_headers).json()
+        assert task["title"] == f"t{i}" == result["task"]["title"]
+
+def test_bulk_mixed_operations(client, auth_headers):
+    first = client.post("/crearTarea", json={"title": "a"}, headers=auth_headers).json()
+    second = client.post("/crearTarea", json={"title": "b"}, headers=auth_headers).json()
+
+    response = client.post("/tasks/bulk", json={"operations": [
+        {"op": "create", "data": {"title": "c"}},
+        {"op": "update", "id": first["id"], "data": {"title": "a2"}},
+        {"op": "delete", "id": second["id"]},
+    ]}, headers=auth_headers)
+
+    assert response.json()["succeeded"] == 3
+    titles = {task["title"] for task in client.get("/listarTareas", headers=auth_headers).json()["tasks"]}
+    assert titles == {"a2", "c"}
+
+def test_bulk_updates_use_one_update(client, auth_headers):
+    ids = [client.post("/crearTarea", json={"title": f"u{i}"}, headers=auth_headers).json()["id"] for i in range(4)]
+    operations = [
+        {"op": "update", "id": ids[0], "data": {"title": "nuevo"}},
+        {"op": "update", "id": ids[1], "data": {"priority": "urgent", "important": True}},
+        {"op": "update", "id": ids[2], "data": {"is_completed": True}},
+        {"op": "update", "id": ids[3], "data": {"status": "in_progress"}},
+    ]
+
+    response, statements = _statements(client, "post", "/tasks/bulk", json={"operations": operations}, headers=auth_headers)
+
+    assert response.json()["succeeded"] == 4
+    assert len([s for s in statements if s.startswith("UPDATE tasks")]) == 1
+    tasks = [client.get(f"/listarTarea/{task_id}", headers=auth_headers).json() for task_id in ids]
+    assert tasks[0]["title"] == "nuevo"
+    assert (tasks[1]["priority"], tasks[1]["important"]) == ("urgent", True)
+    assert (tasks[2]["status"], tasks[2]["is_completed"]) == ("completed", True)
+    assert tasks[3]["status"] == "in_progress"
+    # Las columnas de orden también se actualizan
+    top = client.get("/tareas-prioritarias", params={"limit": 1}, headers=auth_headers).json()
+    assert top[0]["id"] == ids[1]
+
+def test_bulk_create_rolls_back_when_ids_do_not_match(client, auth_headers, monkeypatch):
+    from app.api.routes import tasks as tasks_routes
+
+    insert_tasks = tasks_routes._insert_tasks
+    monkeypatch.setattr(tasks_routes, "_insert_tasks", lambda *args: insert_tasks(*args)[:-1])
+    operations = [{"op": "create", "data": {"title": f"r{i}"}} for i in range(3)]
+
+    response = client.post("/tasks/bulk", json={"operations": operations}, headers=auth_headers)
+
+    assert response.status_code == 409
+    assert client.get("/listarTareas", headers=auth_headers).json()["tasks"] == []
@@ -0,0 +1,12 @@
+from app.schemas.tasks import TaskOut
+
+def test_category_tasks_only_expose_task_out_fields(client, auth_headers):
+    category = client.post("/categories", json={"name": "Trabajo"}, headers=auth_headers).json()
+    client.post("/crearTarea", json={"title": "t1", "category_id": category["id"]}, headers=auth_headers)
+
+    response = client.get(f"/categories/{category['id']}/tasks", headers=auth_headers)
+
+    assert response.status_code == 200
+    tasks = response.json()["tasks"]
+    assert len(tasks) == 1
+    assert set(tasks[0]) == set(TaskOut.__fields__)
@@ -0,0 +1,64 @@
+import pytest
+
+READ_URLS = ["/listarTareas", "/categories", "/notifications", "/user"]
+
+@pytest.fixture
+def seeded(client, auth_headers):
+    """Usuario con una tarea (y su notificación) y una categoría"""
+    task = client.post("/crearTarea", json={"title": "a"}, headers=auth_headers).json()
+    category = client.post("/categories", json={"name": "c"}, headers=auth_headers).json()
+    notification = client.get("/notifications", headers=auth_headers).json()["notifications"][0]
+    return {"headers": auth_headers, "task": task["id"], "category": category["id"], "notification": notification["id"]}
+
+@pytest.mark.parametrize("url", READ_URLS)
+def test_matching_etag_returns_304(client, seeded, url):
+    headers = seeded["headers"]
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    for if_none_match in (etag, etag[2:], f'"otro", {etag}', "*"):
+        response = client.get(url, headers=dict(headers, **{"If-None-Match": if_none_match}))
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+def test_etag_depends_on_query_and_user(client, seeded, register):
+    headers = seeded["headers"]
+    etag = client.get("/listarTareas", headers=headers).headers["ETag"]
+
+    other_query = client.get("/listarTareas", params={"limit": 5}, headers=dict(headers, **{"If-None-Match": etag}))
+    assert other_query.status_code == 200
+    assert other_query.headers["ETag"] != etag
+
+    other_user = client.get("/listarTareas", headers=dict(register(), **{"If-None-Match": etag}))
+    assert other_user.status_code == 200
+
+WRITES = {
+    "crear tarea": lambda c, s: c.post("/crearTarea", json={"title": "b"}, headers=s["headers"]),
+    "editar tarea": lambda c, s: c.put(f"/editarTarea/{s['task']}", json={"title": "a2"}, headers=s["headers"]),
+    "eliminar tarea": lambda c, s: c.delete(f"/eliminarTarea/{s['task']}", headers=s["headers"]),
+    "bulk": lambda c, s: c.post("/tasks/bulk", json={"operations": [{"op": "create", "data": {"title": "b"}}]}, headers=s["headers"]),
+    "importar": lambda c, s: c.post("/tasks/import", files={"file": ("t.csv", b"title\nb\n", "text/csv")}, headers=s["headers"]),
+    "crear categoría": lambda c, s: c.post("/categories", json={"name": "d"}, headers=s["headers"]),
+    "editar categoría": lambda c, s: c.put(f"/categories/{s['category']}", json={"name": "c2"}, headers=s["headers"]),
+    "eliminar categoría": lambda c, s: c.delete(f"/categories/{s['category']}", headers=s["headers"]),
+    "marcar leída": lambda c, s: c.put(f"/notifications/{s['notification']}/read", headers=s["headers"]),
+    "marcar todas": lambda c, s: c.put("/notifications/read-all", headers=s["headers"]),
+    "eliminar notificación": lambda c, s: c.delete(f"/notifications/{s['notification']}", headers=s["headers"]),
+    "editar perfil": lambda c, s: c.put("/user", json={"name": "nuevo", "current_password": "secret1"}, headers=s["headers"]),
+}
+
+@pytest.mark.parametrize("write", list(WRITES), ids=list(WRITES))
+def test_writes_invalidate_etags(client, seeded, write):
+    headers = seeded["headers"]
+    etags = {url: client.get(url, headers=headers).headers["ETag"] for url in READ_URLS}
+
+    response = WRITES[write](client, seeded)
+    assert response.status_code < 300, response.text
+
+    for url, etag in etags.items():
+        after = client.get(url, headers=dict(headers, **{"If-None-Match": etag}))
+        assert after.status_code == 200, url
+        assert after.headers["ETag"] != etag
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from app.api.routes import tasks as tasks_routes
+
+def _create(client, headers):
+    payloads = [
+        {"title": "Canción, con coma", "priority": "high", "important": True},
+        {"title": "b", "priority": "low", "description": "línea 1\nlínea 2"},
+        {"title": "c", "priority": "urgent"},
+    ]
+    return [client.post("/crearTarea", json=payload, headers=headers).json() for payload in payloads]
+
+def test_ndjson_export_matches_listing(client, auth_headers, monkeypatch):
+    # Lotes chicos: la respuesta se arma con varios trozos
+    monkeypatch.setattr(tasks_routes, "EXPORT_BATCH_SIZE", 2)
+    _create(client, auth_headers)
+
+    response = client.get("/tasks/export", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="tareas.ndjson"' in response.headers["content-disposition"]
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    listed = client.get("/listarTareas", params={"limit": 100}, headers=auth_headers).json()["tasks"]
+    assert exported == listed
+
+def test_csv_export_filters_and_round_trips_through_import(client, auth_headers, register):
+    _create(client, auth_headers)
+
+    response = client.get("/tasks/export", params={"format": "csv", "sort": "title:asc", "important": "false"}, headers=auth_headers)
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == ["b", "c"]
+    assert rows[0]["description"] == "línea 1\nlínea 2"
+
+    # Lo exportado se puede importar en otra cuenta
+    other = register()
+    full = client.get("/tasks/export", params={"format": "csv"}, headers=auth_headers).content
+    summary = client.post("/tasks/import", files={"file": ("tareas.csv", full, "text/csv")}, headers=other).json()
+    assert (summary["inserted"], summary["failed"]) == (3, 0)
+    imported = client.get("/listarTareas", params={"sort": "title:asc"}, headers=other).json()["tasks"]
+    assert [(t["title"], t["priority"], t["important"]) for t in imported] == [
+        ("Canción, con coma", "high", True), ("b", "low", False), ("c", "urgent", False),
+    ]
+
+def test_export_only_includes_own_tasks(client, auth_headers, register):
+    _create(client, auth_headers)
+    assert client.get("/tasks/export", headers=register()).text == ""
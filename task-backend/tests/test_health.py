@@ -0,0 +1,11 @@
+from app.core import notification_retention
+
+def test_stats_expose_caches_and_purge_metrics(client):
+    notification_retention.purge()
+    body = client.get("/health/stats").json()
+
+    assert set(body["caches"]) == {"token", "user", "task_stats"}
+    assert "hits" in body["caches"]["token"]
+    retention = body["notification_retention"]
+    assert retention["runs"] >= 1
+    assert retention["last_run"]["rows_purged"] == 0
@@ -0,0 +1,46 @@
+import json
+
+def _import(client, headers, filename, content, content_type="text/csv"):
+    return client.post("/tasks/import", files={"file": (filename, content, content_type)}, headers=headers)
+
+def _titles(client, headers):
+    body = client.get("/listarTareas", params={"limit": 100, "sort": "id:asc"}, headers=headers).json()
+    return [task["title"] for task in body["tasks"]]
+
+def test_csv_import_reports_row_errors_and_creates_categories(client, auth_headers):
+    content = (
+        "﻿title,priority,category,important\n"
+        "Canción,high,Música,true\n"
+        ",low,,\n"
+        "Otra,altísima,,\n"
+        "Ensayo,medium,Música,\n"
+    ).encode("utf-8")
+
+    response = _import(client, auth_headers, "tareas.csv", content)
+
+    assert response.status_code == 200, response.text
+    summary = response.json()
+    assert summary["inserted"] == 2
+    assert summary["failed"] == 2
+    assert summary["categories_created"] == 1
+    assert [error["row"] for error in summary["errors"]] == [3, 4]
+    assert _titles(client, auth_headers) == ["Canción", "Ensayo"]
+
+def test_ndjson_import_reports_invalid_lines(client, auth_headers):
+    lines = [json.dumps({"title": "uno"}), "{no es json", json.dumps([1, 2]), "", json.dumps({"title": "dos", "priority": "low"})]
+    response = _import(client, auth_headers, "tareas.ndjson", "\n".join(lines).encode(), "application/x-ndjson")
+
+    summary = response.json()
+    assert summary["inserted"] == 2
+    assert [error["row"] for error in summary["errors"]] == [2, 3]
+    assert _titles(client, auth_headers) == ["uno", "dos"]
+
+def test_non_utf8_file_is_rejected_before_inserting(client, auth_headers):
+    # Exportado desde Excel en Windows-1252
+    content = "title\nPrimera\nSegunda\nCanción\n".encode("cp1252")
+
+    response = _import(client, auth_headers, "tareas.csv", content)
+
+    assert response.status_code == 400
+    assert "línea 4" in response.json()["detail"]
+    assert _titles(client, auth_headers) == []
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from app.core import jobs
+from app.core.notification_retention import purge_job
+from app.core.unread_counter import repair_job
+
+def _held_lock(acquired):
+    @contextmanager
+    def job_lock(name):
+        yield acquired
+    return job_lock
+
+def test_exclusive_job_skips_when_another_process_holds_the_lock(monkeypatch):
+    calls = []
+    job = jobs.PeriodicJob("prueba", lambda: calls.append(1) or len(calls), 60, exclusive=True)
+
+    monkeypatch.setattr(jobs, "job_lock", _held_lock(True))
+    assert job.run_once() == 1
+    monkeypatch.setattr(jobs, "job_lock", _held_lock(False))
+    assert job.run_once() == 1
+
+    assert calls == [1]
+    assert job.skipped == 1
+
+def test_maintenance_jobs_are_exclusive():
+    assert repair_job.exclusive and purge_job.exclusive
+
+def test_jobs_do_not_start_when_disabled(monkeypatch):
+    monkeypatch.setattr(jobs, "MAINTENANCE_JOBS_ENABLED", False)
+    job = jobs.PeriodicJob("prueba", lambda: None, 60)
+    job.start()
+    assert job._thread is None
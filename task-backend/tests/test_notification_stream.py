@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.core.notification_bus import notification_broker
+from app.main import app
+
+def _stream_scope(headers):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/notifications/stream",
+        "raw_path": b"/notifications/stream",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+def test_stream_slot_released_when_client_leaves_before_first_event(client, auth_headers):
+    before = notification_broker.stats()["connections"]
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        # El cliente ya cerró la conexión: falla el primer envío, antes de que arranque el generador
+        raise OSError("client disconnected")
+
+    with pytest.raises(Exception):
+        asyncio.run(app(_stream_scope(auth_headers), receive, send))
+
+    assert notification_broker.stats()["connections"] == before
+
+def test_stream_ticket_is_single_use(client, auth_headers):
+    from fastapi import HTTPException
+    from app.core import database
+    from app.core.auth import redeem_stream_ticket
+
+    response = client.post("/notifications/stream/ticket", headers=auth_headers)
+    assert response.status_code == 200
+    ticket = response.json()["ticket"]
+
+    with database.SessionLocal() as db:
+        assert redeem_stream_ticket(ticket, db).id
+        with pytest.raises(HTTPException) as exc:
+            redeem_stream_ticket(ticket, db)
+    assert exc.value.status_code == 401
+
+def test_stream_ticket_is_not_an_access_token(client, auth_headers):
+    ticket = client.post("/notifications/stream/ticket", headers=auth_headers).json()["ticket"]
+
+    assert client.get("/notifications", headers={"Authorization": "Bearer " + ticket}).status_code == 401
+
+def test_stream_rejects_access_token_in_query(client, auth_headers):
+    access_token = auth_headers["Authorization"].split(" ", 1)[1]
+
+    assert client.get("/notifications/stream", params={"token": access_token}).status_code == 401
+    assert client.get("/notifications/stream", params={"ticket": access_token}).status_code == 401
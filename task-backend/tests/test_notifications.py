@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event
+from app.core import database
+
+def _create_tasks(client, headers, count):
+    operations = [{"op": "create", "data": {"title": f"t{i}"}} for i in range(count)]
+    assert client.post("/tasks/bulk", json={"operations": operations}, headers=headers).status_code == 200
+
+def test_cursor_walks_every_notification_once(client, auth_headers):
+    _create_tasks(client, auth_headers, 7)
+    client.post("/crearTarea", json={"title": "otra"}, headers=auth_headers)
+
+    seen = []
+    cursor = ""
+    for _ in range(10):  # tope: un cursor que no avanza no debe colgar el test
+        body = client.get("/notifications", params={"limit": 2, "cursor": cursor}, headers=auth_headers).json()
+        seen.extend(notification["id"] for notification in body["notifications"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 8
+    assert seen == sorted(seen, reverse=True)
+
+def _count_statements(client, params, headers):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get("/notifications", params=params, headers=headers)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    return len(statements)
+
+@pytest.mark.parametrize("params", [{}, {"is_read": "false"}, {"is_read": "true"}, {"cursor": ""}])
+def test_listing_runs_constant_number_of_statements(client, register, params):
+    counts = []
+    for notification_count in (1, 20):
+        headers = register()
+        _create_tasks(client, headers, notification_count)
+        counts.append(_count_statements(client, {"limit": 50, **params}, headers))
+
+    assert counts[0] == counts[1]
+
+def test_repair_bumps_data_version_of_fixed_users(client, auth_headers):
+    from app.core import data_version, unread_counter
+    from app.models import models
+
+    user_id = client.post("/crearTarea", json={"title": "descuadre"}, headers=auth_headers).json()["user_id"]
+    db = database.SessionLocal()
+    try:
+        db.query(models.User).filter(models.User.id == user_id).update({"unread_notifications": 42})
+        db.commit()
+        before = data_version.current(db, user_id)
+    finally:
+        db.close()
+
+    assert unread_counter.repair()["users_fixed"] >= 1
+
+    db = database.SessionLocal()
+    try:
+        assert data_version.current(db, user_id) > before
+    finally:
+        db.close()
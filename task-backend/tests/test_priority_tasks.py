@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from sqlalchemy import update
+from app.core import data_version, database
+from app.core.priority_queue import priority_order_by
+from app.models import models
+
+def _db_order(user_id, limit):
+    db = database.SessionLocal()
+    try:
+        return [
+            task_id for (task_id,) in db.query(models.Task.id)
+            .filter(models.Task.user_id == user_id, models.Task.is_completed == False)
+            .order_by(*priority_order_by())
+            .limit(limit)
+        ]
+    finally:
+        db.close()
+
+def _priority_ids(client, headers, limit):
+    response = client.get("/tareas-prioritarias", params={"limit": limit}, headers=headers)
+    assert response.status_code == 200
+    return [task["id"] for task in response.json()]
+
+def _write_from_other_worker(user_id, task_id, **values):
+    """Escritura que no pasa por el índice de este proceso (como la de otro worker)"""
+    db = database.SessionLocal()
+    try:
+        db.execute(update(models.Task).where(models.Task.id == task_id).values(**values))
+        data_version.bump(db, user_id)
+        db.commit()
+    finally:
+        db.close()
+
+def test_priority_tasks_match_db_order(client, auth_headers):
+    soon = (date.today() + timedelta(days=1)).isoformat()
+    later = (date.today() + timedelta(days=9)).isoformat()
+    payloads = [
+        {"title": "a", "priority": "low"},
+        {"title": "b", "priority": "high", "due_date": later},
+        {"title": "c", "priority": "high", "due_date": soon},
+        {"title": "d", "priority": "medium", "important": True},
+        {"title": "e", "priority": "medium"},
+        {"title": "f", "priority": "high"},
+    ]
+    ids = [client.post("/crearTarea", json=payload, headers=auth_headers).json()["id"] for payload in payloads]
+    user_id = client.get(f"/listarTarea/{ids[0]}", headers=auth_headers).json()["user_id"]
+
+    assert _priority_ids(client, auth_headers, 4) == _db_order(user_id, 4)
+
+    # Escrituras por la API: se aplican al índice de forma incremental
+    client.put(f"/editarTarea/{ids[0]}", json={"priority": "high", "important": True}, headers=auth_headers)
+    client.delete(f"/eliminarTarea/{ids[2]}", headers=auth_headers)
+    assert _priority_ids(client, auth_headers, 4) == _db_order(user_id, 4)
+
+    # Escrituras de otro proceso: el data_version no coincide y el índice se reconstruye
+    top = _db_order(user_id, 1)[0]
+    _write_from_other_worker(user_id, top, is_completed=True, status="completed")
+    _write_from_other_worker(user_id, ids[4], important=True)
+    result = _priority_ids(client, auth_headers, 10)
+    assert top not in result
+    assert result == _db_order(user_id, 10)
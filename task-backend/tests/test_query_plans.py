@@ -0,0 +1,69 @@
+from datetime import date
+import pytest
+from sqlalchemy import select, update
+from app.core import database
+from app.core.priority_queue import priority_order_by
+from app.models import models
+
+Task = models.Task
+Notification = models.Notification
+Category = models.Category
+
+# (consulta caliente, índice compuesto que debe usar)
+HOT_QUERIES = {
+    "list_tasks": (
+        select(Task).where(Task.user_id == 1).order_by(Task.created_at.desc(), Task.id.desc()).limit(11),
+        "ix_tasks_user_created",
+    ),
+    "list_tasks_status": (
+        select(Task).where(Task.user_id == 1, Task.status == "pending").order_by(Task.created_at.desc(), Task.id.desc()).limit(11),
+        "ix_tasks_user_status_created",
+    ),
+    "list_tasks_category": (
+        select(Task).where(Task.user_id == 1, Task.category_id == 3),
+        "ix_tasks_user_category",
+    ),
+    "priority_pending": (
+        select(Task.id, Task.priority_rank, Task.due_sort_key, Task.important, Task.is_completed)
+        .where(Task.user_id == 1, Task.is_completed == False),
+        "ix_tasks_user_priority",
+    ),
+    "upcoming": (
+        select(Task).where(
+            Task.user_id == 1, Task.is_completed == False, Task.due_date.isnot(None),
+            Task.due_date >= date(2026, 1, 1), Task.due_date <= date(2026, 1, 4),
+        ).order_by(*priority_order_by()).limit(10),
+        "ix_tasks_user_completed_due",
+    ),
+    "notifications": (
+        select(Notification).where(Notification.user_id == 1)
+        .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(11),
+        "ix_notifications_user_created",
+    ),
+    "notifications_unread": (
+        select(Notification).where(Notification.user_id == 1, Notification.is_read == False)
+        .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(11),
+        "ix_notifications_user_read_created",
+    ),
+    "category_name": (
+        select(Category).where(Category.user_id == 1, Category.name == "Trabajo"),
+        "ix_categories_user_name",
+    ),
+    "unlink_category": (
+        update(Task).where(Task.category_id == 3).values(category_id=None),
+        "ix_tasks_category",
+    ),
+}
+
+def _query_plan(connection, statement) -> str:
+    compiled = statement.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).all()
+    return "\n".join(row[-1] for row in rows)
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_composite_index(client, name):
+    statement, index = HOT_QUERIES[name]
+    with database.engine.connect() as connection:
+        plan = _query_plan(connection, statement)
+    assert f"INDEX {index} " in plan, plan
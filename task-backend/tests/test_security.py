@@ -0,0 +1,21 @@
+import time
+from app.core import security
+
+def test_hash_pool_starts_without_fork_and_recovers_when_broken(monkeypatch):
+    monkeypatch.setattr(security, "HASH_WORKERS", 1)
+    security.start_hash_executor()
+    try:
+        executor = security._hash_executor
+        assert executor._mp_context.get_start_method() != "fork"
+
+        hashed = security.hash_password("secret1")
+        assert security.verify_password("secret1", hashed)
+
+        # Un worker muerto (p. ej. OOM) rompe el pool: se recrea y se reintenta
+        for process in list(executor._processes.values()):
+            process.kill()
+        time.sleep(0.2)
+        assert security.verify_password("secret1", hashed)
+        assert security._hash_executor is not executor
+    finally:
+        security.shutdown_hash_executor()
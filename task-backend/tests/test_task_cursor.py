@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import date, timedelta
+import pytest
+
+def _cursor(payload):
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _walk(client, headers, **params):
+    seen = []
+    cursor = ""
+    for _ in range(20):  # tope: un cursor que no avanza no debe colgar el test
+        response = client.get("/listarTareas", params=dict(params, limit=2, cursor=cursor), headers=headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        seen.extend(task["id"] for task in body["tasks"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    return seen
+
+@pytest.fixture
+def tasks_headers(client, auth_headers):
+    tomorrow = date.today() + timedelta(days=1)
+    payloads = [
+        {"title": "b", "priority": "high", "due_date": tomorrow.isoformat()},
+        {"title": "a", "priority": "low"},
+        {"title": "a", "priority": "high", "important": True},
+        {"title": "c", "priority": "medium", "due_date": (tomorrow + timedelta(days=3)).isoformat()},
+        {"title": "b", "priority": "medium"},
+    ]
+    for payload in payloads:
+        assert client.post("/crearTarea", json=payload, headers=auth_headers).status_code == 201
+    return auth_headers
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"sort": "title:asc"},
+    {"sort": "due_date:desc"},
+    {"sort": "created_at:asc"},
+    {"use_priority_queue": "true"},
+])
+def test_cursor_walks_every_task_once_in_offset_order(client, tasks_headers, params):
+    expected = [
+        task["id"] for task in
+        client.get("/listarTareas", params=dict(params, limit=100), headers=tasks_headers).json()["tasks"]
+    ]
+    seen = _walk(client, tasks_headers, **params)
+    assert len(expected) == 5
+    assert seen == expected
+
+@pytest.mark.parametrize("cursor", [
+    _cursor({"s": "created_at:desc", "v": [{"x": 1}, 3]}),
+    _cursor({"s": "created_at:desc", "v": [[1, 2], 3]}),
+    _cursor({"s": "created_at:desc", "v": "abc"}),
+    _cursor({"s": "created_at:desc", "v": [3]}),
+    _cursor({"s": "created_at:desc", "v": [{"dt": "2024-01-01T00:00:00"}, 3, 4]}),
+    _cursor({"s": "created_at:desc", "v": [{"dt": 5}, 3]}),
+    _cursor({"s": "created_at:desc", "v": [{"dt": "ayer"}, 3]}),
+    _cursor(["no", "es", "un", "objeto"]),
+    _cursor({"s": "title:asc", "v": ["a", 3]}),
+    "%%%no-base64",
+])
+def test_tampered_cursor_is_rejected(client, auth_headers, cursor):
+    response = client.get("/listarTareas", params={"cursor": cursor}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+from sqlalchemy import event, update
+from app.core import data_version, database
+from app.models import models
+
+def _stats(client, headers):
+    response = client.get("/tasks/stats", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+def test_stats_counts(client, auth_headers):
+    category = client.post("/categories", json={"name": "Trabajo"}, headers=auth_headers).json()["id"]
+    today = date.today().isoformat()
+    payloads = [
+        {"title": "a", "priority": "high", "important": True, "category_id": category, "due_date": today},
+        {"title": "b", "priority": "high", "category_id": category},
+        {"title": "c", "priority": "low"},
+        {"title": "d", "priority": "urgent", "due_date": (date.today() + timedelta(days=30)).isoformat()},
+    ]
+    ids = [client.post("/crearTarea", json=payload, headers=auth_headers).json()["id"] for payload in payloads]
+    client.put(f"/editarTarea/{ids[1]}", json={"is_completed": True}, headers=auth_headers)
+    client.put(f"/editarTarea/{ids[2]}", json={"status": "in_progress"}, headers=auth_headers)
+
+    stats = _stats(client, auth_headers)
+
+    assert stats["total"] == 4
+    assert stats["by_status"] == {"pending": 2, "in_progress": 1, "completed": 1, "cancelled": 0}
+    assert stats["by_priority"] == {"low": 1, "medium": 0, "high": 2, "urgent": 1}
+    assert stats["important"] == 1
+    assert stats["overdue"] == 0
+    assert stats["due_this_week"] == 1
+    assert stats["by_category"] == [
+        {"category_id": category, "name": "Trabajo", "total": 2, "completed": 1},
+        {"category_id": None, "name": None, "total": 2, "completed": 0},
+    ]
+
+def test_stats_cache_follows_data_version(client, auth_headers):
+    task_id = client.post("/crearTarea", json={"title": "a"}, headers=auth_headers).json()["id"]
+    assert _stats(client, auth_headers)["overdue"] == 0
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        _stats(client, auth_headers)
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+    # En caché: solo se lee users.data_version (además de la autenticación)
+    assert not any("GROUP BY" in statement for statement in statements)
+
+    # Escritura de otro worker (vencida: la API no acepta fechas pasadas)
+    db = database.SessionLocal()
+    try:
+        user_id = db.query(models.Task.user_id).filter(models.Task.id == task_id).scalar()
+        db.execute(update(models.Task).where(models.Task.id == task_id).values(due_date=date.today() - timedelta(days=2)))
+        data_version.bump(db, user_id)
+        db.commit()
+    finally:
+        db.close()
+
+    assert _stats(client, auth_headers)["overdue"] == 1